@@ -4,19 +4,34 @@ import json
 import re
 import pickle
 import threading
+import time
+_IMPORT_START = time.perf_counter()
+import struct
+import zlib
+import base64
+import html
+import sqlite3
+import bisect
+import collections
+import itertools
+import hashlib
+import heapq
+import random
+import uuid
+from concurrent.futures import Future
 import difflib
 import requests
 from datetime import datetime, timezone
 import weakref
+import importlib
+import contextlib
+import abc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 from dotenv import load_dotenv
 load_dotenv(override=True) 
-import google.generativeai as genai
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 import traceback
 import faulthandler
 faulthandler.enable()    
@@ -28,12 +43,83 @@ def excepthook(exc_type, exc_value, exc_tb):
     print("".join(lines))
     sys.exit(1)
 sys.excepthook = excepthook
+
+
+#Startup profiling (python Pathwise.py --profile-startup)
+
+class StartupProfiler:
+    """
+    Collects named phase timings while the app starts; phases cost nothing
+    unless --profile-startup was passed. report() prints the table once.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.phases = []
+        self.reported = False
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.phases.append((name, seconds))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("Startup profile:")
+        for name, seconds in self.phases:
+            print(f"  {name:<32}{seconds * 1000:>9.1f} ms")
+        print(f"  {'total since first import':<32}{(time.perf_counter() - _IMPORT_START) * 1000:>9.1f} ms")
+
+
+STARTUP_PROFILE = StartupProfiler("--profile-startup" in sys.argv)
+STARTUP_PROFILE.record("imports", time.perf_counter() - _IMPORT_START)
+_MODULE_INIT_START = time.perf_counter()
+
+
+#Lazy SDK imports (the Gemini and Gmail client libraries load on first use)
+
+_LAZY_MODULES = {}
+_LAZY_LOCK = threading.Lock()
+
+
+def _lazy_import(name):
+    with _LAZY_LOCK:
+        module = _LAZY_MODULES.get(name)
+        if module is None:
+            with STARTUP_PROFILE.phase(f"import {name}"):
+                module = _LAZY_MODULES[name] = importlib.import_module(name)
+        return module
+
+
+def genai_sdk():
+    return _lazy_import("google.generativeai")
+
+
+def google_auth_request():
+    return _lazy_import("google.auth.transport.requests").Request()
+
+
+def gmail_oauth_flow(credentials_path, scopes):
+    return _lazy_import("google_auth_oauthlib.flow").InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
+
+
+def gmail_service(creds):
+    return _lazy_import("googleapiclient.discovery").build("gmail", "v1", credentials=creds, cache_discovery=False)
+
+
 #Constants & Globals
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 TOKEN_FILE = "gmail_token.pickle"
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_KEY)
-GEMINI_MODEL = genai.GenerativeModel("gemini-2.5-flash")
 
 #Gmail Monitor (no-n8n)
 
@@ -54,7 +140,7 @@ class GmailMonitor(QObject):
             return None
         creds = pickle.load(open(TOKEN_FILE, "rb"))
         if creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+            creds.refresh(google_auth_request())
             pickle.dump(creds, open(TOKEN_FILE, "wb"))
         return creds
 
@@ -62,7 +148,7 @@ class GmailMonitor(QObject):
         creds = self._get_creds()
         if not creds:
             return
-        self.service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+        self.service = gmail_service(creds)
         self.timer.start()
         self._tick()
 
@@ -78,9 +164,7 @@ class GmailMonitor(QObject):
     def _poll(self):
         if not self.service:
             return
-        for app in self.apps:
-            if not app.get("auto_monitor"):
-                continue
+        for app in self.apps.monitored():
             domains = app.get("school_domains", [])
             if not domains:
                 continue
@@ -123,7 +207,8 @@ class GmailMonitor(QObject):
         prompt = ("Return exactly one word: Accepted / Rejected / Waitlisted / Deferred, "
                   "or None if no clear decision.\n\nEmail:\n" + text)
         try:
-            ans = GEMINI_MODEL.generate_content(prompt).text.strip()
+            ans = LLM_SERVICE.submit(lambda: generate_text(prompt, feature="decision"),
+                                     priority=PRIORITY_BACKGROUND, feature="decision").result().strip()
             return ans if ans in {"Accepted", "Rejected", "Waitlisted", "Deferred"} else None
         except Exception as e:
             print("Gemini decide error:", e)
@@ -220,15 +305,2165 @@ def fetch_colleges(min_sat=0, max_sat=1600, state="", ownership="", api_key="fIr
         return []
 
 
-#Securely load API key for Gemini with .env
-gemini_api_key = GEMINI_KEY
-if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
-    
-    model = genai.GenerativeModel("gemini-2.5-flash")
-else:
+#LLM backends (Gemini, local stand-in, stand-in over HTTP)
+
+LLM_BACKEND_SETTING = os.getenv("PATHWISE_LLM_BACKEND", "gemini")
+STANDIN_LATENCY = float(os.getenv("PATHWISE_STANDIN_LATENCY", "0.05"))
+STANDIN_CHUNK_DELAY = float(os.getenv("PATHWISE_STANDIN_CHUNK_DELAY", "0.01"))
+
+class LLMBackend(abc.ABC):
+    """
+    What generate_text talks to. generate() returns (text, (prompt tokens,
+    output tokens)) and passes each streamed piece to on_chunk as it arrives;
+    token counts are None when the backend does not report them.
+    """
+    model_name = "unknown"
+
+    @abc.abstractmethod
+    def generate(self, prompt, stream=False, on_chunk=None, generation_config=None):
+        """Asks the model once; raises on failure so generate_text can retry or record it."""
+
+
+def _response_text(response):
+    if not response.parts:
+        feedback = response.prompt_feedback
+        block_reason = "Unknown"
+        if feedback and hasattr(feedback, 'block_reason') and feedback.block_reason:
+            block_reason = feedback.block_reason.name
+        raise ValueError(f"The AI response was empty. Reason: {block_reason}")
+    return response.text
+
+
+def _usage(response):
+    """(prompt tokens, output tokens) from a response's usage_metadata, None where not reported."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None
+    return getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, api_key, model_name="gemini-2.5-flash"):
+        self.api_key = api_key
+        #Same normalisation GenerativeModel applies, so cache keys match across versions
+        self.model_name = model_name if "/" in model_name else f"models/{model_name}"
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        #The SDK (and grpc/protobuf behind it) is only imported for the first real request
+        with self._model_lock:
+            if self._model is None:
+                genai = genai_sdk()
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def generate(self, prompt, stream=False, on_chunk=None, generation_config=None):
+        on_chunk = on_chunk or (lambda text: None)
+        kwargs = {"generation_config": generation_config} if generation_config else {}
+        if not stream:
+            response = self.model.generate_content(prompt, **kwargs)
+            text = _response_text(response)
+            on_chunk(text)
+            return text, _usage(response)
+        response = self.model.generate_content(prompt, stream=True, **kwargs)
+        pieces = []
+        for chunk in response:
+            if not chunk.parts:
+                continue
+            pieces.append(chunk.text)
+            on_chunk(chunk.text)
+        text = "".join(pieces)
+        if not text.strip():
+            _response_text(response)
+            raise ValueError("The AI response was empty.")
+        return text, _usage(response)
+
+
+class StandInBackend(LLMBackend):
+    """
+    Deterministic local stand-in for offline runs and load tests. The same
+    prompt always gives the same text; latency (plus prompt_latency per 1,000
+    prompt tokens) is paid before the first chunk and chunk_delay between chunks. Prompts asking for a response_schema get
+    schema-valid JSON. responses maps prompt substrings to canned replies.
+    """
+    model_name = "standin"
+    WORDS = ("energy", "motion", "the", "ball", "falls", "because", "nature", "student", "career", "college",
+             "research", "project", "major", "simple", "idea", "experiment", "measure", "force", "learn", "build")
+
+    def __init__(self, latency=STANDIN_LATENCY, chunk_delay=STANDIN_CHUNK_DELAY, chunks=8, words=120,
+                 responses=None, prompt_latency=0.0):
+        self.latency = latency
+        self.prompt_latency = prompt_latency
+        self.chunk_delay = chunk_delay
+        self.chunks = max(1, chunks)
+        self.words = words
+        self.responses = responses or {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def respond(self, prompt, generation_config=None):
+        for needle, reply in self.responses.items():
+            if needle in prompt:
+                return reply
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        schema = (generation_config or {}).get("response_schema")
+        if schema:
+            return json.dumps(self._from_schema(schema, rng))
+        sentences = []
+        for _ in range(max(1, self.words // 10)):
+            sentence = " ".join(rng.choice(self.WORDS) for _ in range(10))
+            sentences.append(sentence.capitalize() + ".")
+        return " ".join(sentences)
+
+    def _from_schema(self, schema, rng):
+        kind = str(schema.get("type", "string")).lower()
+        if kind == "object":
+            return {k: self._from_schema(v, rng) for k, v in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self._from_schema(schema.get("items", {}), rng) for _ in range(rng.randint(3, 6))]
+        if kind in ("integer", "number"):
+            return rng.randint(0, 100)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return " ".join(rng.choice(self.WORDS) for _ in range(rng.randint(3, 12))).capitalize()
+
+    def generate(self, prompt, stream=False, on_chunk=None, generation_config=None):
+        with self._lock:
+            self.calls += 1
+        text = self.respond(prompt, generation_config)
+        time.sleep(self.latency + len(prompt) / 4 / 1000 * self.prompt_latency)
+        if stream:
+            size = -(-len(text) // self.chunks)
+            for i in range(0, len(text), size):
+                if i:
+                    time.sleep(self.chunk_delay)
+                if on_chunk:
+                    on_chunk(text[i:i + size])
+        elif on_chunk:
+            on_chunk(text)
+        return text, (len(prompt) // 4, len(text) // 4)
+
+
+class StandInServer:
+    """
+    Serves a backend over HTTP on a background thread. POST /generate with
+    {"prompt", "stream", "generation_config"} answers with newline-delimited
+    JSON: {"text": ...} per chunk, then {"done": true, "usage": [p, o]}.
+    """
+    def __init__(self, backend=None, host="127.0.0.1", port=0):
+        backend = backend or StandInBackend()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send(obj):
+                    data = (json.dumps(obj) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                try:
+                    _, usage = backend.generate(body.get("prompt", ""), stream=body.get("stream", False),
+                                                on_chunk=lambda text: send({"text": text}),
+                                                generation_config=body.get("generation_config"))
+                    send({"done": True, "usage": list(usage)})
+                except Exception as e:
+                    send({"error": str(e)})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="StandInServer")
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class HTTPBackend(LLMBackend):
+    """Client for StandInServer (or anything speaking the same protocol)."""
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.model_name = self.url
+        self.session = requests.Session()
+
+    def generate(self, prompt, stream=False, on_chunk=None, generation_config=None):
+        payload = {"prompt": prompt, "stream": stream, "generation_config": generation_config}
+        pieces = []
+        try:
+            with self.session.post(f"{self.url}/generate", json=payload, stream=True, timeout=self.timeout) as r:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    if "error" in message:
+                        raise ValueError(message["error"])
+                    if "text" in message:
+                        pieces.append(message["text"])
+                        if on_chunk:
+                            on_chunk(message["text"])
+                    if message.get("done"):
+                        return "".join(pieces), tuple(message.get("usage") or (None, None))
+        except requests.RequestException as e:
+            #Surface transport failures as ConnectionError so generate_text retries them
+            raise ConnectionError(str(e))
+        raise ConnectionError("Stand-in server closed the stream early.")
+
+
+def create_backend(setting=LLM_BACKEND_SETTING):
+    """Backend named by PATHWISE_LLM_BACKEND: "gemini" (default), "standin" or a stand-in server URL."""
+    if setting == "standin":
+        return StandInBackend()
+    if setting.startswith(("http://", "https://")):
+        return HTTPBackend(setting)
+    if GEMINI_KEY:
+        return GeminiBackend(GEMINI_KEY)
     print("WARNING: GEMINI_API_KEY environment variable not set. AI features might not work.")
-    model = None
+    return None
+
+LLM_BACKEND = create_backend()
+
+
+#LLM response cache
+
+LLM_CACHE_FILE = "llm_cache.db"
+
+class LLMResponseCache:
+    """
+    Persistent cache of model responses keyed on a hash of the normalized
+    prompt, model name and generation config. Entries expire after ttl
+    seconds and the least recently used ones are evicted past max_entries
+    or max_bytes. Hit/miss counters are kept per feature.
+    """
+    def __init__(self, path=LLM_CACHE_FILE, max_entries=500, max_bytes=50 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        #Opened on first use so importing Pathwise never touches the disk
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, feature TEXT, response BLOB, "
+                "size INTEGER, created REAL, last_access REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        return self._conn
+
+    @staticmethod
+    def normalize_prompt(prompt):
+        #Only whitespace is folded; case can change what the model is asked
+        return re.sub(r"\s+", " ", prompt).strip()
+
+    def make_key(self, prompt, model_name, generation_config=None):
+        material = json.dumps({
+            "prompt": self.normalize_prompt(prompt),
+            "model": model_name,
+            "config": generation_config or {},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key, feature="default"):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                with db:
+                    db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self.hits[feature] += 1
+                return zlib.decompress(row[0]).decode("utf-8")
+            if row:
+                with db:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.misses[feature] += 1
+            return None
+
+    def put(self, key, text, feature="default"):
+        blob = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, feature, blob, len(blob), now, now))
+                self._evict(db, now)
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count > self.max_entries:
+            db.execute("DELETE FROM responses WHERE key IN "
+                       "(SELECT key FROM responses ORDER BY last_access LIMIT ?)", (count - self.max_entries,))
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            row = db.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+            if not row:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            total -= row[1]
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM responses")
+
+    def stats(self):
+        features = sorted(set(self.hits) | set(self.misses))
+        return {f: {"hits": self.hits[f], "misses": self.misses[f]} for f in features}
+
+LLM_CACHE = LLMResponseCache()
+
+
+#LLM telemetry (latency, tokens, cache hits and failures per feature)
+
+LLM_TELEMETRY_MAX_RECORDS = 5000
+LLM_TELEMETRY_QUANTILES = (0.5, 0.9, 0.99)
+
+class LLMTelemetry:
+    """
+    In-memory log of every generate_text call: wall time, time to first
+    token, prompt/output token counts from usage_metadata and the outcome
+    ("ok", "cache_hit", "error" or "cancelled"). Keeps the most recent
+    max_records calls and exports them as JSONL or Prometheus text.
+    """
+    OUTCOMES = ("ok", "cache_hit", "error", "cancelled")
+
+    def __init__(self, max_records=LLM_TELEMETRY_MAX_RECORDS):
+        self.records = collections.deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, feature, outcome, wall, ttft=None, prompt_tokens=None, output_tokens=None,
+               attempts=1, error=None):
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "feature": feature,
+            "outcome": outcome,
+            "wall_s": round(wall, 4),
+            "ttft_s": round(ttft, 4) if ttft is not None else None,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "attempts": attempts,
+            "error": error,
+        }
+        with self._lock:
+            self.records.append(entry)
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    @staticmethod
+    def percentile(values, q):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self):
+        """Per-feature counts, token totals and latency/TTFT percentiles."""
+        by_feature = collections.defaultdict(list)
+        for entry in self.snapshot():
+            by_feature[entry["feature"]].append(entry)
+        result = {}
+        for feature, entries in sorted(by_feature.items()):
+            outcomes = collections.Counter(e["outcome"] for e in entries)
+            model_calls = [e for e in entries if e["outcome"] == "ok"]
+            walls = [e["wall_s"] for e in model_calls]
+            ttfts = [e["ttft_s"] for e in model_calls if e["ttft_s"] is not None]
+            result[feature] = {
+                "calls": len(entries),
+                **{o: outcomes[o] for o in self.OUTCOMES},
+                "prompt_tokens": sum(e["prompt_tokens"] or 0 for e in entries),
+                "output_tokens": sum(e["output_tokens"] or 0 for e in entries),
+                "wall": {q: self.percentile(walls, q) for q in LLM_TELEMETRY_QUANTILES},
+                "ttft": {q: self.percentile(ttfts, q) for q in LLM_TELEMETRY_QUANTILES},
+            }
+        return result
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in self.snapshot():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def prometheus_text(self):
+        entries = self.snapshot()
+        lines = [
+            "# HELP pathwise_llm_calls_total LLM calls by feature and outcome.",
+            "# TYPE pathwise_llm_calls_total counter",
+        ]
+        calls = collections.Counter((e["feature"], e["outcome"]) for e in entries)
+        for (feature, outcome), n in sorted(calls.items()):
+            lines.append(f'pathwise_llm_calls_total{{feature="{feature}",outcome="{outcome}"}} {n}')
+        for kind in ("prompt", "output"):
+            lines.append(f"# HELP pathwise_llm_{kind}_tokens_total {kind.capitalize()} tokens reported by the model.")
+            lines.append(f"# TYPE pathwise_llm_{kind}_tokens_total counter")
+            totals = collections.Counter()
+            for e in entries:
+                totals[e["feature"]] += e[f"{kind}_tokens"] or 0
+            for feature, n in sorted(totals.items()):
+                lines.append(f'pathwise_llm_{kind}_tokens_total{{feature="{feature}"}} {n}')
+        for name, field, help_text in (("latency", "wall_s", "Wall time of model calls."),
+                                       ("ttft", "ttft_s", "Time to first token of model calls.")):
+            metric = f"pathwise_llm_{name}_seconds"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            by_feature = collections.defaultdict(list)
+            for e in entries:
+                if e["outcome"] == "ok" and e[field] is not None:
+                    by_feature[e["feature"]].append(e[field])
+            for feature, values in sorted(by_feature.items()):
+                for q in LLM_TELEMETRY_QUANTILES:
+                    lines.append(f'{metric}{{feature="{feature}",quantile="{q}"}} {self.percentile(values, q)}')
+                lines.append(f'{metric}_sum{{feature="{feature}"}} {round(sum(values), 4)}')
+                lines.append(f'{metric}_count{{feature="{feature}"}} {len(values)}')
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+
+LLM_TELEMETRY = LLMTelemetry()
+
+
+#LLM execution service (bounded workers, priorities, rate limit, retries)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+LLM_WORKERS = int(os.getenv("PATHWISE_LLM_WORKERS", "3"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("PATHWISE_LLM_RPM", "60"))
+LLM_MAX_RETRIES = 4
+LLM_RETRY_BASE_DELAY = 1.0
+LLM_RETRY_MAX_DELAY = 30.0
+LLM_RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """Token bucket shared by every model call so bursts cannot exhaust the quota."""
+    def __init__(self, per_minute=LLM_REQUESTS_PER_MINUTE, burst=10):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+LLM_RATE_LIMITER = RateLimiter()
+
+
+class RequestCancelled(Exception):
+    """Raised inside an AI task whose request was cancelled or superseded."""
+
+
+class InvalidResponseError(ValueError):
+    """A model reply rejected by the caller's validate function; it is never cached."""
+
+
+class CancelToken:
+    """Cancelled explicitly or whenever its parent token is."""
+    def __init__(self, parent=None):
+        self._event = threading.Event()
+        self.parent = parent
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelled()
+
+
+class RequestTracker:
+    """
+    Hands out request ids and cancel tokens per UI panel. Starting a new
+    request for a panel cancels the one before it, and only the current
+    request id may deliver results to that panel.
+    """
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def start(self, panel):
+        token = CancelToken()
+        with self._lock:
+            previous = self._current.get(panel)
+            if previous:
+                previous[1].cancel()
+            request_id = next(self._ids)
+            self._current[panel] = (request_id, token)
+        return request_id, token
+
+    def is_current(self, panel, request_id):
+        with self._lock:
+            current = self._current.get(panel)
+            return current is not None and current[0] == request_id
+
+    def finish(self, panel, request_id):
+        with self._lock:
+            current = self._current.get(panel)
+            if current and current[0] == request_id:
+                del self._current[panel]
+
+    def cancel(self, panel):
+        with self._lock:
+            current = self._current.pop(panel, None)
+        if current:
+            current[1].cancel()
+
+
+class LLMService(QObject):
+    """
+    Worker pool that runs every AI task. Jobs are taken in priority order,
+    and background jobs may only occupy workers - 1 threads so an
+    interactive request always has a free worker; with workers=1 the pool
+    still runs one background thread plus one kept for interactive work. submit() returns a
+    concurrent.futures.Future; on_done, if given, is called with that
+    future on the GUI thread.
+    """
+    _completed = pyqtSignal(object, object)
+
+    def __init__(self, workers=LLM_WORKERS):
+        super().__init__()
+        self.max_background = max(1, workers - 1)
+        self.workers = self.max_background + 1
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running_background = 0
+        self._threads = []
+        self._completed.connect(self._deliver)
+
+    def submit(self, fn, priority=PRIORITY_INTERACTIVE, feature="default", on_done=None, cancel_token=None):
+        future = Future()
+        future.cancel_token = cancel_token
+        with self._cond:
+            if not self._threads:
+                for i in range(self.workers):
+                    t = threading.Thread(target=self._work, name=f"LLMWorker-{i}", daemon=True)
+                    t.start()
+                    self._threads.append(t)
+            heapq.heappush(self._heap, (priority, next(self._seq), fn, future, feature, on_done))
+            self._cond.notify_all()
+        return future
+
+    def _take(self):
+        if not self._heap:
+            return None
+        if self._heap[0][0] >= PRIORITY_BACKGROUND:
+            if self._running_background >= self.max_background:
+                return None
+            self._running_background += 1
+        return heapq.heappop(self._heap)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._take()
+                while job is None:
+                    self._cond.wait()
+                    job = self._take()
+            priority, _, fn, future, feature, on_done = job
+            try:
+                #A request superseded while still queued never reaches the model
+                if future.cancel_token and future.cancel_token.cancelled:
+                    future.cancel()
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn())
+                    except RequestCancelled as e:
+                        future.set_exception(e)
+                    except BaseException as e:
+                        print(f"LLM task '{feature}' failed: {e}")
+                        future.set_exception(e)
+            finally:
+                if priority >= PRIORITY_BACKGROUND:
+                    with self._cond:
+                        self._running_background -= 1
+                        self._cond.notify_all()
+            if on_done and not future.cancelled():
+                self._completed.emit(on_done, future)
+
+    @pyqtSlot(object, object)
+    def _deliver(self, callback, future):
+        callback(future)
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+LLM_SERVICE = LLMService()
+
+
+def _is_retryable(error):
+    #google.api_core exceptions carry the HTTP status as .code
+    code = getattr(error, "code", None)
+    if callable(code):
+        code = None
+    return code in LLM_RETRYABLE_CODES or isinstance(error, (TimeoutError, ConnectionError))
+
+
+def generate_text(prompt, feature, stream=False, on_chunk=None, bypass_cache=False, generation_config=None,
+                  cancel_token=None, validate=None):
+    """
+    Single entry point for model calls. Serves repeats from LLM_CACHE;
+    bypass_cache=True (regenerate) always asks the model and refreshes the entry.
+    With stream=True each chunk is passed to on_chunk as it arrives; a cache
+    hit is delivered to on_chunk as one chunk. Once cancel_token is cancelled
+    the stream is abandoned and RequestCancelled is raised; partial text is
+    never cached. If validate is given it is called with the reply before
+    caching; a ValueError from it becomes InvalidResponseError and the reply
+    is not cached (a cached reply that fails it is treated as a miss).
+    Every call is recorded in LLM_TELEMETRY.
+    """
+    start = time.perf_counter()
+    first_chunk = [None]
+    attempts = 0
+
+    def check(text):
+        if validate is not None:
+            try:
+                validate(text)
+            except ValueError as e:
+                raise InvalidResponseError(str(e)) from e
+    try:
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        backend = LLM_BACKEND
+        if backend is None:
+            raise ValueError("Gemini model not initialized. API key missing.")
+        key = LLM_CACHE.make_key(prompt, backend.model_name, generation_config)
+        if not bypass_cache:
+            cached = LLM_CACHE.get(key, feature)
+            if cached is not None:
+                try:
+                    check(cached)
+                except InvalidResponseError:
+                    cached = None
+            if cached is not None:
+                if on_chunk:
+                    on_chunk(cached)
+                wall = time.perf_counter() - start
+                LLM_TELEMETRY.record(feature, "cache_hit", wall, ttft=wall, attempts=0)
+                return cached
+
+        def forward(text):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            if first_chunk[0] is None:
+                first_chunk[0] = time.perf_counter() - start
+            if on_chunk:
+                on_chunk(text)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            LLM_RATE_LIMITER.acquire()
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            attempts += 1
+            try:
+                text, (prompt_tokens, output_tokens) = backend.generate(prompt, stream, forward, generation_config)
+                break
+            except Exception as e:
+                #Never retry once text has reached the UI, it would be shown twice
+                if first_chunk[0] is not None or attempt == LLM_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"Gemini {feature} call failed ({e}); retrying in {delay:.1f}s.")
+                time.sleep(delay)
+        check(text)
+    except RequestCancelled:
+        LLM_TELEMETRY.record(feature, "cancelled", time.perf_counter() - start, ttft=first_chunk[0], attempts=attempts)
+        raise
+    except Exception as e:
+        LLM_TELEMETRY.record(feature, "error", time.perf_counter() - start, ttft=first_chunk[0], attempts=attempts,
+                             error=f"{type(e).__name__}: {e}")
+        raise
+    LLM_TELEMETRY.record(feature, "ok", time.perf_counter() - start, ttft=first_chunk[0],
+                         prompt_tokens=prompt_tokens, output_tokens=output_tokens, attempts=attempts)
+    if text.strip():
+        LLM_CACHE.put(key, text, feature)
+    return text
+
+
+#Parallel long-form generation (outline, then sections concurrently)
+
+LONG_FORM_SECTIONS = 6
+
+
+def parse_outline(text, limit=LONG_FORM_SECTIONS):
+    titles = []
+    for line in (text or "").splitlines():
+        title = re.sub(r"^\s*(?:\d+[.)]|[-*•#]+)\s*", "", line).strip().strip("*").strip()
+        if title:
+            titles.append(title)
+    return titles[:limit]
+
+
+class SectionStitcher:
+    """
+    Receives streamed chunks for several sections in any order and passes
+    them on in outline order: the earliest unfinished section streams live,
+    later ones are buffered until every section before them has finished.
+    """
+    def __init__(self, count, emit, separator="\n\n"):
+        self._pieces = [[] for _ in range(count)]
+        self._emitted = [0] * count
+        self._done = [False] * count
+        self._current = 0
+        self._emit = emit
+        self._separator = separator
+        self._lock = threading.Lock()
+
+    def feed(self, index, text):
+        with self._lock:
+            self._pieces[index].append(text)
+            if index == self._current:
+                self._flush(index)
+
+    def complete(self, index):
+        with self._lock:
+            self._done[index] = True
+            while self._current < len(self._done) and self._done[self._current]:
+                self._flush(self._current)
+                self._current += 1
+            if self._current < len(self._done):
+                self._flush(self._current)
+
+    def _flush(self, index):
+        pending = self._pieces[index][self._emitted[index]:]
+        if not pending:
+            return
+        if index and not self._emitted[index]:
+            pending = [self._separator] + pending
+        self._emitted[index] = len(self._pieces[index])
+        self._emit("".join(pending))
+
+    def text(self):
+        with self._lock:
+            return self._separator.join("".join(p).strip() for p in self._pieces if "".join(p).strip())
+
+
+def run_concurrently(jobs, cancel_token=None, priority=PRIORITY_INTERACTIVE, service=None):
+    """
+    Runs job(token) callables on LLM_SERVICE at the caller's priority and
+    returns their results in order, so fan-out shares the service's worker
+    bound, priority order and background cap. The calling thread also runs
+    any job no worker has picked up yet, so a caller that is itself a service
+    job never waits on a queue it is holding a worker from. The first
+    failure cancels the remaining jobs and is re-raised.
+    """
+    service = service or LLM_SERVICE
+    #One failed job stops the rest instead of paying for output that will be discarded
+    jobs_token = CancelToken(parent=cancel_token)
+    results = [None] * len(jobs)
+    errors = [None] * len(jobs)
+    claimed = [False] * len(jobs)
+    done = [threading.Event() for _ in jobs]
+    lock = threading.Lock()
+
+    def run(index):
+        with lock:
+            if claimed[index]:
+                return
+            claimed[index] = True
+        try:
+            results[index] = jobs[index](jobs_token)
+        except Exception as e:
+            errors[index] = e
+            jobs_token.cancel()
+        finally:
+            done[index].set()
+
+    for index in range(len(jobs)):
+        service.submit(lambda index=index: run(index), priority=priority, feature="fan_out",
+                       cancel_token=jobs_token)
+    for index in range(len(jobs)):
+        run(index)
+    for event in done:
+        event.wait()
+    failures = [e for e in errors if e is not None]
+    if failures:
+        raise next((e for e in failures if not isinstance(e, RequestCancelled)), failures[0])
+    return results
+
+
+def generate_long_form(topic, instructions, on_chunk=None, bypass_cache=False, cancel_token=None,
+                       sections=LONG_FORM_SECTIONS, priority=PRIORITY_INTERACTIVE):
+    """
+    Asks for a short outline, then writes every section concurrently through
+    LLM_SERVICE. Wall time is roughly the outline plus the slowest section
+    instead of the sum of all of them. Chunks reach on_chunk in outline order.
+    """
+    outline_prompt = (
+        f"Plan a long, thorough explanation of '{topic}' for curious high schoolers. "
+        f"Reply with exactly {sections} short section titles in teaching order, one per line, "
+        f"with no numbering and nothing else."
+    )
+    titles = parse_outline(generate_text(outline_prompt, feature="explainer_outline", bypass_cache=bypass_cache,
+                                         cancel_token=cancel_token), sections)
+    if not titles:
+        raise ValueError("The AI returned an empty outline.")
+    outline = "\n".join(f"{i + 1}. {t}" for i, t in enumerate(titles))
+    stitcher = SectionStitcher(len(titles), on_chunk or (lambda text: None))
+
+    def write(index, title, token):
+        prompt = (
+            f"{instructions}\n\nThe whole explanation follows this outline:\n{outline}\n\n"
+            f"Write only part {index + 1}, '{title}', about two pages long. Continue naturally from the "
+            f"part before it, don't repeat the other parts and don't add a heading."
+        )
+        try:
+            generate_text(prompt, feature="explainer_section", stream=True,
+                          on_chunk=lambda text: stitcher.feed(index, text),
+                          bypass_cache=bypass_cache, cancel_token=token)
+        finally:
+            stitcher.complete(index)
+
+    run_concurrently([lambda token, i=i, t=t: write(i, t, token) for i, t in enumerate(titles)],
+                     cancel_token=cancel_token, priority=priority)
+    return stitcher.text()
+
+
+#Persistence Service (single writer thread)
+
+def move_aside(path):
+    """Renames an unreadable data file to path.bak (or path.bak.N) and returns the new name."""
+    backup = path + ".bak"
+    counter = 1
+    while os.path.exists(backup):
+        backup = f"{path}.bak.{counter}"
+        counter += 1
+    os.replace(path, backup)
+    return backup
+
+
+class PersistenceService:
+    """
+    Owns writes to on-disk state. Callers enqueue work and return at once;
+    one writer thread applies it in submission order, in small batches.
+    JSON documents are written to a temp file, fsynced and renamed into place
+    so a crash never leaves a torn file, and a queued write of a path is
+    replaced by a newer write of the same path instead of running twice.
+    """
+    def __init__(self, batch_window=0.05):
+        self.batch_window = batch_window
+        self._cond = threading.Condition()
+        self._ops = collections.OrderedDict()
+        self._seq = itertools.count()
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="PersistenceWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, key=None):
+        """Queues fn to run on the writer thread. Ops sharing a key collapse to the latest, in its place."""
+        with self._cond:
+            if self._closed:
+                #Late writes after shutdown still land, just synchronously
+                fn()
+                return
+            if key is None:
+                key = ("op", next(self._seq))
+            #Re-queue at the end so a collapsed op never runs ahead of ops submitted before it
+            self._ops.pop(key, None)
+            self._ops[key] = fn
+            self._cond.notify_all()
+
+    def write_json(self, path, data, indent=2):
+        #Serialise now so later in-memory edits cannot race with the writer
+        payload = json.dumps(data, indent=indent).encode("utf-8")
+        self.submit(lambda: self._atomic_write(path, payload), key=("file", os.path.abspath(path)))
+
+    def write_json_later(self, path, build, indent=2):
+        """Like write_json, but build() makes the document on the writer thread."""
+        self.submit(lambda: self._atomic_write(path, json.dumps(build(), indent=indent).encode("utf-8")),
+                    key=("file", os.path.abspath(path)))
+
+    @staticmethod
+    def _atomic_write(path, payload: bytes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ops and not self._closed:
+                    self._cond.wait()
+                if not self._ops:
+                    return
+            #Give a burst of saves (e.g. typing in notes) a moment to collapse
+            time.sleep(self.batch_window)
+            with self._cond:
+                batch = list(self._ops.values())
+                self._ops.clear()
+                self._busy = True
+            for fn in batch:
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"Persistence write failed: {e}")
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is on disk."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._ops and not self._busy, timeout)
+
+    def close(self, timeout=10):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+
+#Compression for stored AI outputs
+
+COMPRESS_MIN_CHARS = 512
+ZSTD_DICT_FILE = "pathwise_zstd.dict"
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class TextCodec:
+    """
+    Stores long text fields as {"codec": ..., "data": <base64>} wrappers.
+    Plain strings (short fields, or files written before compression) pass
+    through decode() untouched, so old data keeps loading.
+    """
+    def __init__(self, codec=None, level=6, dict_path=ZSTD_DICT_FILE, min_chars=COMPRESS_MIN_CHARS):
+        codec = codec or os.getenv("PATHWISE_COMPRESSION", "zlib")
+        if codec == "zstd" and zstandard is None:
+            print("WARNING: zstandard is not installed, falling back to zlib compression.")
+            codec = "zlib"
+        self.codec = codec
+        self.level = level
+        self.dict_path = dict_path
+        self.min_chars = min_chars
+        self._dicts = {}
+        self._zstd_dict = None
+        self._memo = {}
+        self._lock = threading.Lock()
+        if codec == "zstd" and os.path.exists(dict_path):
+            with open(dict_path, "rb") as f:
+                self._set_dictionary(zstandard.ZstdCompressionDict(f.read()))
+
+    def _set_dictionary(self, zdict):
+        self._zstd_dict = zdict
+        self._dicts[zdict.dict_id()] = zdict
+
+    def _dict_file(self, dict_id):
+        root, ext = os.path.splitext(self.dict_path)
+        return f"{root}.{dict_id}{ext}"
+
+    def _dictionary(self, dict_id):
+        """The zstd dictionary with this id, loaded from its own file (or the current one) on first use."""
+        zdict = self._dicts.get(dict_id)
+        if zdict is None:
+            for path in (self._dict_file(dict_id), self.dict_path):
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        candidate = zstandard.ZstdCompressionDict(f.read())
+                    if candidate.dict_id() == dict_id:
+                        zdict = self._dicts[dict_id] = candidate
+                        break
+        return zdict
+
+    def train_dictionary(self, samples, size=64 * 1024):
+        """Trains a shared zstd dictionary from sample texts and saves it for later runs."""
+        if zstandard is None:
+            return False
+        zdict = zstandard.train_dictionary(size, [s.encode("utf-8") for s in samples if s])
+        #Every dictionary is also kept under its id: data compressed with an older one must stay readable
+        for d in (self._zstd_dict, zdict):
+            if d is not None and not os.path.exists(self._dict_file(d.dict_id())):
+                with open(self._dict_file(d.dict_id()), "wb") as f:
+                    f.write(d.as_bytes())
+        with open(self.dict_path, "wb") as f:
+            f.write(zdict.as_bytes())
+        self._set_dictionary(zdict)
+        return True
+
+    def encode(self, text):
+        if not isinstance(text, str) or len(text) < self.min_chars:
+            return text
+        cached = self._memo.get(text)
+        if cached is not None:
+            return cached
+        raw = text.encode("utf-8")
+        if self.codec == "zstd":
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dict)
+            wrapped = {"codec": "zstd", "data": base64.b64encode(compressor.compress(raw)).decode("ascii")}
+            if self._zstd_dict is not None:
+                wrapped["dict"] = self._zstd_dict.dict_id()
+        else:
+            wrapped = {"codec": "zlib", "data": base64.b64encode(zlib.compress(raw, self.level)).decode("ascii")}
+        with self._lock:
+            #Saves are frequent (notes autosave) but explanations rarely change
+            if len(self._memo) > 256:
+                self._memo.clear()
+            self._memo[text] = wrapped
+        return wrapped
+
+    def decode(self, value):
+        if not isinstance(value, dict) or "codec" not in value:
+            return value
+        blob = base64.b64decode(value["data"])
+        if value["codec"] == "zlib":
+            text = zlib.decompress(blob).decode("utf-8")
+        elif value["codec"] == "zstd":
+            if zstandard is None:
+                raise RuntimeError("This data was stored with zstd; install the zstandard package to read it.")
+            zdict = None
+            if "dict" in value:
+                zdict = self._dictionary(value["dict"])
+                if zdict is None:
+                    raise RuntimeError(f"zstd dictionary {value['dict']} not found ({self.dict_path}).")
+            text = zstandard.ZstdDecompressor(dict_data=zdict).decompress(blob).decode("utf-8")
+        else:
+            raise ValueError(f"Unknown text codec: {value['codec']}")
+        with self._lock:
+            if len(self._memo) > 256:
+                self._memo.clear()
+            self._memo[text] = value
+        return text
+
+    def encode_fields(self, record: dict, fields):
+        return {k: (self.encode(v) if k in fields else v) for k, v in record.items()}
+
+    def decode_fields(self, record: dict, fields):
+        return {k: (self.decode(v) if k in fields else v) for k, v in record.items()}
+
+TEXT_CODEC = TextCodec()
+
+
+#Career History Log (append-only JSONL)
+
+CAREER_HISTORY_FILE = "career_history.jsonl"
+LEGACY_CAREER_HISTORY_FILE = "career_history.json"
+
+class CareerHistoryLog:
+    """
+    Append-only JSONL log of career generations, one record per line.
+    A sidecar .idx file stores the byte offset of every record so the most
+    recent entries can be read without parsing the whole log. on_dropped is
+    called with the raw records that compaction removed.
+    """
+    OFFSET = struct.Struct("<Q")
+    COMPRESSED_FIELDS = ("result",)
+
+    def __init__(self, path=CAREER_HISTORY_FILE, max_entries=500, max_age_days=365,
+                 fsync_every=8, fsync_interval=2.0, codec=TEXT_CODEC, background=None, on_dropped=None):
+        self.path = path
+        self.codec = codec
+        self.background = background
+        self.on_dropped = on_dropped
+        self.index_path = path + ".idx"
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._offsets = []
+        self._size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compacting = False
+        self._open()
+        self._migrate_legacy()
+        self.maybe_compact()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._offsets)
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+        self._repair_tail()
+        self._size = os.path.getsize(self.path)
+        if not self._load_index():
+            self._rebuild_index()
+        self._file = open(self.path, "ab")
+        self._index_file = open(self.index_path, "ab")
+
+    def _repair_tail(self):
+        #Drop a torn last line left behind by a crash mid-append
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                nl = f.read(step).rfind(b"\n")
+                if nl != -1:
+                    f.truncate(pos + nl + 1)
+                    return
+            f.truncate(0)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return self._size == 0
+        with open(self.index_path, "rb") as f:
+            raw = f.read()
+        if len(raw) % self.OFFSET.size:
+            return False
+        offsets = [o for (o,) in self.OFFSET.iter_unpack(raw)]
+        if not offsets:
+            return self._size == 0
+        if offsets[-1] >= self._size:
+            return False
+        #The last indexed record must be the last line in the log
+        with open(self.path, "rb") as f:
+            f.seek(offsets[-1])
+            f.readline()
+            if f.tell() != self._size:
+                return False
+        self._offsets = offsets
+        return True
+
+    def _rebuild_index(self):
+        offsets = []
+        pos = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                pos += len(line)
+        self._offsets = offsets
+        self._write_index()
+
+    def _write_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(self.OFFSET.pack(o) for o in self._offsets))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+    def _migrate_legacy(self):
+        if self._offsets or not os.path.exists(LEGACY_CAREER_HISTORY_FILE):
+            return
+        try:
+            with open(LEGACY_CAREER_HISTORY_FILE, "r") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Could not migrate {LEGACY_CAREER_HISTORY_FILE}: {e}")
+            return
+        for entry in legacy:
+            self.append(entry, sync=False)
+        self.sync()
+        os.replace(LEGACY_CAREER_HISTORY_FILE, LEGACY_CAREER_HISTORY_FILE + ".migrated")
+        print(f"Migrated {len(legacy)} career history entries to {self.path}.")
+
+    def append(self, record: dict, sync=True):
+        """Appends one record. fsync is batched by count and time window."""
+        record = self.codec.encode_fields(record, self.COMPRESSED_FIELDS)
+        record.setdefault("id", uuid.uuid4().hex)
+        record.setdefault("ts", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._index_file.write(self.OFFSET.pack(self._size))
+            self._index_file.flush()
+            self._offsets.append(self._size)
+            self._size += len(line)
+            self._unsynced += 1
+            due = (self._unsynced >= self.fsync_every or
+                   time.monotonic() - self._last_sync >= self.fsync_interval)
+            if sync and due:
+                self.sync()
+        self.maybe_compact()
+
+    def sync(self):
+        with self._lock:
+            if not self._unsynced:
+                return
+            os.fsync(self._file.fileno())
+            os.fsync(self._index_file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def recent(self, n=20):
+        """Returns the last n records, oldest first, reading only their bytes."""
+        return [self.codec.decode_fields(r, self.COMPRESSED_FIELDS) for r in self._read_raw(n)]
+
+    def _read_raw(self, n=None):
+        """The last n raw records (all of them when n is None), oldest first."""
+        #Offsets are only valid for the file they were taken from, so read while compact() can't swap it
+        with self._lock:
+            if not self._offsets or (n is not None and n <= 0):
+                return []
+            start = self._offsets[-n] if n is not None and n < len(self._offsets) else self._offsets[0]
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                chunk = f.read(self._size - start)
+        return [json.loads(line) for line in chunk.splitlines() if line.strip()]
+
+    def entries(self):
+        return self.recent(None)
+
+    def _raw_entries(self):
+        return self._read_raw()
+
+    #Compaction & retention
+    def _needs_compaction(self):
+        #Hysteresis so we do not rewrite the file on every append past the limit
+        return len(self._offsets) > self.max_entries + max(10, self.max_entries // 4)
+
+    def maybe_compact(self, force=False):
+        with self._lock:
+            if self._compacting or not (force or self._needs_compaction() or self._has_expired()):
+                return
+            self._compacting = True
+        if self.background:
+            self.background(self.compact)
+        else:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def _has_expired(self):
+        if not self.max_age_days or not self._offsets:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[0])
+            line = f.readline()
+        try:
+            oldest = json.loads(line)
+        except json.JSONDecodeError:
+            return True
+        return self._expired(oldest, datetime.now(timezone.utc))
+
+    def _expired(self, record, now):
+        ts = record.get("ts")
+        if not self.max_age_days or not ts:
+            return False
+        try:
+            age = now - datetime.fromisoformat(ts)
+        except (TypeError, ValueError):
+            return False
+        return age.days > self.max_age_days
+
+    def compact(self):
+        """Rewrites the log keeping only entries allowed by the retention policy."""
+        try:
+            with self._lock:
+                now = datetime.now(timezone.utc)
+                records = self._raw_entries()
+                kept = [r for r in records if not self._expired(r, now)]
+                if self.max_entries:
+                    kept = kept[-self.max_entries:]
+                kept_ids = {id(r) for r in kept}
+                dropped = [r for r in records if id(r) not in kept_ids]
+                tmp = self.path + ".tmp"
+                offsets = []
+                pos = 0
+                with open(tmp, "wb") as f:
+                    for r in kept:
+                        line = (json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8")
+                        offsets.append(pos)
+                        f.write(line)
+                        pos += len(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._file.close()
+                self._index_file.close()
+                os.replace(tmp, self.path)
+                self._offsets = offsets
+                self._size = pos
+                self._write_index()
+                self._file = open(self.path, "ab")
+                self._index_file = open(self.index_path, "ab")
+                self._unsynced = 0
+                print(f"Compacted {self.path}: dropped {len(dropped)} entries, kept {len(kept)}.")
+            if dropped and self.on_dropped:
+                self.on_dropped(dropped)
+        except Exception as e:
+            print(f"Career history compaction failed: {e}")
+        finally:
+            self._compacting = False
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            self._file.close()
+            self._index_file.close()
+
+
+#Full-text search (SQLite FTS5, BM25 ranking)
+
+SEARCH_INDEX_FILE = "search_index.db"
+
+class SearchIndex:
+    """
+    Incremental full-text index over explainer topics, notes and career results.
+    Rows are upserted whenever that content is persisted, so searching never
+    has to read history.json or the career log.
+    """
+    HL_START, HL_END = "\x02", "\x03"
+
+    def __init__(self, path=SEARCH_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5("
+                "doc_id UNINDEXED, kind UNINDEXED, title, body, tokenize='porter unicode61')"
+            )
+            self.available = True
+        except sqlite3.OperationalError as e:
+            print(f"WARNING: SQLite FTS5 unavailable, search disabled: {e}")
+            self.available = False
+
+    def is_empty(self):
+        if not self.available:
+            return False
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM docs LIMIT 1").fetchone() is None
+
+    def upsert(self, doc_id, kind, title, body):
+        if not self.available:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+            self.conn.execute("INSERT INTO docs (doc_id, kind, title, body) VALUES (?, ?, ?, ?)",
+                              (doc_id, kind, title, body or ""))
+
+    def upsert_many(self, rows):
+        if not self.available:
+            return
+        with self._lock, self.conn:
+            for doc_id, kind, title, body in rows:
+                self.conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+                self.conn.execute("INSERT INTO docs (doc_id, kind, title, body) VALUES (?, ?, ?, ?)",
+                                  (doc_id, kind, title, body or ""))
+
+    def delete(self, doc_id):
+        if not self.available:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+
+    def delete_many(self, doc_ids):
+        if not self.available:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM docs WHERE doc_id = ?", [(d,) for d in doc_ids])
+
+    def get(self, doc_id):
+        if not self.available:
+            return None
+        with self._lock:
+            row = self.conn.execute("SELECT kind, title, body FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        return {"kind": row[0], "title": row[1], "body": row[2]} if row else None
+
+    @staticmethod
+    def _match_expression(query):
+        #Quote every term so user input can never be parsed as FTS5 syntax
+        terms = re.findall(r"\w+", query, re.UNICODE)
+        return " ".join(f'"{t}"*' for t in terms)
+
+    def search(self, query, limit=50):
+        """Returns BM25-ranked hits with an HTML snippet, best first."""
+        expr = self._match_expression(query)
+        if not self.available or not expr:
+            return []
+        sql = (
+            "SELECT doc_id, kind, title, "
+            f"snippet(docs, -1, '{self.HL_START}', '{self.HL_END}', '…', 16), "
+            "bm25(docs, 0.0, 0.0, 8.0, 1.0) AS score "
+            "FROM docs WHERE docs MATCH ? ORDER BY score LIMIT ?"
+        )
+        with self._lock:
+            try:
+                rows = self.conn.execute(sql, (expr, limit)).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Search error for {query!r}: {e}")
+                return []
+        hits = []
+        for doc_id, kind, title, snippet, score in rows:
+            snippet = html.escape(snippet).replace(self.HL_START, "<b>").replace(self.HL_END, "</b>")
+            hits.append({"doc_id": doc_id, "kind": kind, "title": title, "snippet": snippet, "score": score})
+        return hits
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+#Application Registry (indexed in-memory store)
+
+class ApplicationRegistry:
+    """
+    In-memory store of tracked applications with secondary indexes by id,
+    sender domain, result/status/auto_monitor and deadline. Every mutation
+    goes through add/update/remove so the indexes stay in step; the dicts it
+    hands out must not be modified directly.
+    Listeners are called as listener(event, old, new) with event one of
+    "added", "updated", "removed" or "reset".
+    """
+    INDEXED_FIELDS = ("result", "status", "auto_monitor")
+
+    def __init__(self, applications=None):
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._insights = None
+        self.reset(applications or [])
+
+    #Read API
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        #Iterate over a snapshot so background readers never see the dict resize
+        with self._lock:
+            return iter(list(self._by_id.values()))
+
+    def __contains__(self, app_id):
+        return app_id in self._by_id
+
+    def get(self, app_id):
+        return self._by_id.get(app_id)
+
+    def to_list(self):
+        with self._lock:
+            return list(self._by_id.values())
+
+    def where(self, field, value):
+        with self._lock:
+            return [self._by_id[i] for i in self._by_field[field].get(value, ())]
+
+    def count(self, field, value):
+        return len(self._by_field[field].get(value, ()))
+
+    def counts(self, field):
+        """Number of applications per distinct value of an indexed field."""
+        with self._lock:
+            return {value: len(ids) for value, ids in self._by_field[field].items()}
+
+    def by_result(self, result):
+        return self.where("result", result)
+
+    def by_status(self, status):
+        return self.where("status", status)
+
+    def monitored(self):
+        return self.where("auto_monitor", True)
+
+    def by_domain(self, domain):
+        """Applications whose school sends mail from domain or one of its parent domains."""
+        domain = domain.lower().lstrip("@")
+        parts = domain.split(".")
+        with self._lock:
+            ids = set()
+            for i in range(len(parts) - 1):
+                ids |= self._by_domain.get(".".join(parts[i:]), set())
+            return [self._by_id[i] for i in ids]
+
+    def insights(self):
+        """Running dashboard totals for this registry, created on first use."""
+        with self._lock:
+            if self._insights is None:
+                self._insights = InsightsAggregator(self)
+            return self._insights
+
+    def upcoming_deadlines(self, after=None, limit=None):
+        """Applications ordered by deadline, optionally only those on/after an ISO date."""
+        with self._lock:
+            start = bisect.bisect_left(self._deadlines, (after, "")) if after else 0
+            end = len(self._deadlines) if limit is None else start + limit
+            return [self._by_id[i] for _, i in self._deadlines[start:end]]
+
+    def next_id(self, school_name, submission_date):
+        candidate = f"{school_name.replace(' ', '_').lower()}_{submission_date}"
+        if candidate not in self._by_id:
+            return candidate
+        counter = 1
+        while f"{candidate}_{counter}" in self._by_id:
+            counter += 1
+        return f"{candidate}_{counter}"
+
+    #Mutations
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, old, new):
+        for listener in list(self._listeners):
+            try:
+                listener(event, old, new)
+            except Exception as e:
+                print(f"Application registry listener error: {e}")
+
+    def reset(self, applications):
+        with self._lock:
+            self._by_id = {}
+            self._by_domain = {}
+            self._by_field = {f: {} for f in self.INDEXED_FIELDS}
+            self._deadlines = []
+            for app in applications:
+                #A repeated id would hide the earlier record and the next save would drop it
+                if not app.get("id") or app["id"] in self._by_id:
+                    app["id"] = self.next_id(app.get("school_name", "app"), app.get("submission_date", ""))
+                self._by_id[app["id"]] = app
+                self._index(app)
+        self._notify("reset", None, None)
+
+    def add(self, app: dict):
+        with self._lock:
+            if not app.get("id") or app["id"] in self._by_id:
+                app["id"] = self.next_id(app.get("school_name", "app"), app.get("submission_date", ""))
+            self._by_id[app["id"]] = app
+            self._index(app)
+        self._notify("added", None, app)
+        return app
+
+    def update(self, app_id, changes: dict):
+        """Applies changes to one application; returns the updated dict or None if unknown."""
+        with self._lock:
+            app = self._by_id.get(app_id)
+            if app is None:
+                return None
+            old = self._snapshot(app)
+            self._unindex(app)
+            app.update(changes)
+            app["id"] = app_id
+            self._index(app)
+        self._notify("updated", old, app)
+        return app
+
+    def append_event(self, app_id, event: str, date: str):
+        app = self._by_id.get(app_id)
+        if app is None:
+            return None
+        timeline = list(app.get("timeline", []))
+        timeline.append({"event": event, "date": date})
+        return self.update(app_id, {"timeline": timeline})
+
+    def remove(self, app_id):
+        with self._lock:
+            app = self._by_id.pop(app_id, None)
+            if app is None:
+                return None
+            self._unindex(app)
+        self._notify("removed", app, None)
+        return app
+
+    #Index maintenance
+    @staticmethod
+    def _snapshot(app):
+        snap = dict(app)
+        snap["timeline"] = list(app.get("timeline", []))
+        return snap
+
+    def _index(self, app):
+        app_id = app["id"]
+        for field in self.INDEXED_FIELDS:
+            self._by_field[field].setdefault(app.get(field), set()).add(app_id)
+        for dom in app.get("school_domains") or []:
+            self._by_domain.setdefault(dom.lower(), set()).add(app_id)
+        if app.get("deadline"):
+            bisect.insort(self._deadlines, (app["deadline"], app_id))
+
+    def _unindex(self, app):
+        app_id = app["id"]
+        for field in self.INDEXED_FIELDS:
+            bucket = self._by_field[field].get(app.get(field))
+            if bucket:
+                bucket.discard(app_id)
+                if not bucket:
+                    del self._by_field[field][app.get(field)]
+        for dom in app.get("school_domains") or []:
+            bucket = self._by_domain.get(dom.lower())
+            if bucket:
+                bucket.discard(app_id)
+                if not bucket:
+                    del self._by_domain[dom.lower()]
+        if app.get("deadline"):
+            key = (app["deadline"], app_id)
+            pos = bisect.bisect_left(self._deadlines, key)
+            if pos < len(self._deadlines) and self._deadlines[pos] == key:
+                self._deadlines.pop(pos)
+
+
+#Dashboard Q&A context (compact, token-budgeted)
+
+QA_CONTEXT_TOKEN_BUDGET = 800
+QA_CHARS_PER_TOKEN = 4
+QA_UPCOMING_DEADLINES = 5
+QA_STOPWORDS = {
+    "a", "an", "the", "of", "at", "in", "on", "to", "for", "and", "or", "is", "are", "was", "were",
+    "my", "me", "i", "did", "do", "does", "what", "which", "where", "when", "how", "many", "much",
+    "any", "have", "has", "get", "got", "from", "with", "about", "still", "yet", "am", "be",
+    "university", "college", "school", "institute", "state",
+}
+#Words in a question that point at a particular result bucket
+RESULT_KEYWORDS = {
+    "Accepted": ("accept", "admit", "admission", "got in", "offer"),
+    "Rejected": ("reject", "denied", "deny", "turned down"),
+    "Waitlisted": ("waitlist", "wait list", "wait-list"),
+    "Deferred": ("defer",),
+    "Pending": ("pending", "waiting", "awaiting", "haven't heard", "not heard", "undecided"),
+}
+QA_ROW_FIELDS = ("school_name", "major", "status", "result", "deadline", "submission_date")
+
+
+def _qa_tokens(text):
+    return {t for t in re.findall(r"[a-z0-9]+", (text or "").casefold()) if t not in QA_STOPWORDS and len(t) > 1}
+
+
+def decision_days(app):
+    """Days between submission and the Decision Released timeline event, or None."""
+    sub = app.get("submission_date")
+    release_event = next((e for e in app.get("timeline", []) if e.get("event") == "Decision Released"), None)
+    if not (sub and release_event):
+        return None
+    try:
+        sub_date = datetime.strptime(sub, "%Y-%m-%d")
+        dec_date = datetime.strptime(release_event.get("date"), "%Y-%m-%d")
+    except Exception:
+        return None
+    return (dec_date - sub_date).days
+
+
+def results_in_question(question):
+    q = (question or "").casefold()
+    return [result for result, words in RESULT_KEYWORDS.items() if any(w in q for w in words)]
+
+
+def schools_in_question(registry, question):
+    """Applications whose school name (or its distinctive words) appears in the question."""
+    q = (question or "").casefold()
+    q_tokens = _qa_tokens(question)
+    matches = []
+    for app in registry:
+        name = (app.get("school_name") or "").casefold()
+        if not name:
+            continue
+        name_tokens = _qa_tokens(name)
+        if (name_tokens and name_tokens <= q_tokens) or (name in q and re.search(rf"\b{re.escape(name)}\b", q)):
+            matches.append(app)
+    return matches
+
+
+def _qa_row(app):
+    return " | ".join(str(app.get(f) or "-") for f in QA_ROW_FIELDS)
+
+
+def build_dashboard_context(registry, question, budget=QA_CONTEXT_TOKEN_BUDGET, today=None):
+    """
+    Compact prompt context for a dashboard question: aggregates over every
+    application, the next few deadlines, and then only the rows relevant to
+    the question (school names first, then result and keyword matches) until
+    the token budget runs out. Prompt size stays roughly constant however
+    many applications are tracked.
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    max_chars = budget * QA_CHARS_PER_TOKEN
+    counts = registry.counts("result")
+    lines = [f"Total applications: {len(registry)}"]
+    lines.append("By result: " + (", ".join(f"{r or 'Unknown'} {n}" for r, n in sorted(counts.items(), key=lambda kv: str(kv[0]))) or "none"))
+    avg_days = registry.insights().average_decision_days()
+    lines.append(f"Average decision time: {avg_days:.1f} days" if avg_days is not None
+                 else "Average decision time: N/A")
+    upcoming = registry.upcoming_deadlines(after=today, limit=QA_UPCOMING_DEADLINES)
+    if upcoming:
+        lines.append("Upcoming deadlines: " + "; ".join(f"{a.get('school_name', 'N/A')} {a['deadline']}" for a in upcoming))
+
+    #Rank rows: named schools, then asked-about results, then keyword overlap
+    ranked = {}
+    for app in schools_in_question(registry, question):
+        ranked[app["id"]] = (0, app)
+    for result in results_in_question(question):
+        for app in registry.by_result(result):
+            ranked.setdefault(app["id"], (1, app))
+    q_tokens = _qa_tokens(question)
+    if q_tokens:
+        for app in registry:
+            if app["id"] in ranked:
+                continue
+            overlap = len(q_tokens & _qa_tokens(" ".join(str(app.get(f) or "") for f in QA_ROW_FIELDS)))
+            if overlap:
+                ranked[app["id"]] = (2 - overlap / (len(q_tokens) + 1), app)
+    rows = [app for _, app in sorted(ranked.values(), key=lambda r: (r[0], r[1].get("deadline") or ""))]
+    if not rows and len(registry) <= QA_UPCOMING_DEADLINES * 4:
+        rows = registry.to_list()
+
+    header = "Relevant applications (" + " | ".join(QA_ROW_FIELDS) + "):"
+    used = sum(len(line) + 1 for line in lines) + len(header) + 1
+    shown = []
+    for app in rows:
+        row = _qa_row(app)
+        if used + len(row) + 1 > max_chars:
+            break
+        shown.append(row)
+        used += len(row) + 1
+    if shown:
+        lines.append(header)
+        lines.extend(shown)
+    if len(shown) < len(rows):
+        lines.append(f"({len(rows) - len(shown)} more matching applications not shown)")
+    return "\n".join(lines)
+
+
+#Local answers for common dashboard questions (no LLM round trip)
+
+#Questions asking for judgement or advice always go to the model
+QA_OPEN_ENDED = ("should", "why", "advice", "advise", "recommend", "chance", "likely", "improve", "compare",
+                 "better", "best", "worth", "explain", "help me", "think", "suggest", "feel")
+RESULT_PHRASES = {
+    "Accepted": "accepted at",
+    "Rejected": "rejected by",
+    "Waitlisted": "waitlisted at",
+    "Deferred": "deferred at",
+    "Pending": "still waiting to hear from",
+}
+QA_LIST_LIMIT = 10
+
+
+def _join_names(apps, limit=QA_LIST_LIMIT):
+    names = sorted(a.get("school_name") or "Unknown" for a in apps)
+    if len(names) > limit:
+        names = names[:limit] + [f"{len(names) - limit} more"]
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + f" and {names[-1]}"
+
+
+def _pending_apps(registry):
+    return [a for r in ("Pending", "Waitlisted", "Deferred") for a in registry.by_result(r)]
+
+
+def answer_dashboard_question(registry, question, today=None):
+    """
+    Answers result filters, counts, deadline ordering and per-school lookups
+    straight from the registry. Returns None when the question is open-ended
+    or not understood, so the caller can fall back to the model.
+    """
+    q = (question or "").casefold().strip()
+    if not q or any(re.search(rf"\b{re.escape(w)}", q) for w in QA_OPEN_ENDED):
+        return None
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    results = results_in_question(q)
+    awaiting = "Pending" in results and not re.search(r"\bpending\b", q)
+    schools = schools_in_question(registry, question)
+
+    #Per-school lookup
+    if schools:
+        parts = []
+        for app in schools[:QA_LIST_LIMIT]:
+            detail = f"{app.get('school_name')}: {app.get('result') or 'Pending'}"
+            if app.get("status"):
+                detail += f" (status {app['status']})"
+            if app.get("deadline"):
+                detail += f", deadline {app['deadline']}"
+            parts.append(detail)
+        return "; ".join(parts) + "."
+
+    #Deadline ordering
+    if "deadline" in q or "due" in re.findall(r"[a-z]+", q):
+        upcoming = registry.upcoming_deadlines(after=today, limit=QA_LIST_LIMIT)
+        if not upcoming:
+            return "You have no upcoming deadlines."
+        if re.search(r"\b(next|soonest|earliest|first|closest)\b", q):
+            nxt = upcoming[0]
+            return f"Your next deadline is {nxt.get('school_name')} on {nxt['deadline']}."
+        return "Your upcoming deadlines are " + ", ".join(
+            f"{a.get('school_name')} ({a['deadline']})" for a in upcoming) + "."
+
+    #Counts
+    if re.search(r"\bhow many\b|\bnumber of\b|\bcount\b", q):
+        if awaiting:
+            n = len(_pending_apps(registry))
+            return f"You are waiting on {n} decision{'s' if n != 1 else ''}."
+        if results:
+            return " ".join(f"You have {registry.count('result', r)} {r.lower()} application"
+                            f"{'s' if registry.count('result', r) != 1 else ''}." for r in results)
+        if re.search(r"\bappl(y|ied|ications?)\b|\bschools?\b|\bcolleges?\b|\btotal\b", q):
+            n = len(registry)
+            return f"You have {n} application{'s' if n != 1 else ''} tracked."
+        return None
+
+    #Result filters
+    if results:
+        answers = []
+        for r in results:
+            apps = _pending_apps(registry) if r == "Pending" and awaiting else registry.by_result(r)
+            if apps:
+                answers.append(f"You were {RESULT_PHRASES[r]} {_join_names(apps)}." if r != "Pending"
+                               else f"You are {RESULT_PHRASES[r]} {_join_names(apps)}.")
+            else:
+                answers.append(f"You have no {r.lower()} applications.")
+        return " ".join(answers)
+    return None
+
+
+#Dashboard insights (running aggregates, no scan on read)
+
+class InsightsAggregator:
+    """
+    Dashboard totals kept in step with an ApplicationRegistry through its
+    listener events: counts per result, the set of applications still
+    awaiting a decision and the running sum/count of decision times. Each
+    event costs O(1) in the number of applications; only "reset" rescans.
+    Records without a result count towards no result, as registry.count does.
+    Get one through registry.insights() so every reader shares it.
+    """
+    AWAITING_RESULTS = ("Pending", "Waitlisted", "Deferred")
+
+    def __init__(self, registry):
+        self._lock = threading.Lock()
+        self.registry = registry
+        registry.add_listener(self._on_registry_event)
+        self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self.total = 0
+            self.by_result = collections.Counter()
+            self.pending = set()
+            self.decision_sum = 0
+            self.decision_count = 0
+            self._days = {}  #app id -> decision days, so removal needn't re-parse the timeline
+            for app in self.registry:
+                self._add(app)
+
+    def _add(self, app):
+        app_id = app["id"]
+        result = app.get("result")
+        self.total += 1
+        self.by_result[result] += 1
+        if result in self.AWAITING_RESULTS:
+            self.pending.add(app_id)
+        days = decision_days(app)
+        if days is not None:
+            self._days[app_id] = days
+            self.decision_sum += days
+            self.decision_count += 1
+
+    def _remove(self, app):
+        app_id = app["id"]
+        result = app.get("result")
+        self.total -= 1
+        self.by_result[result] -= 1
+        if self.by_result[result] <= 0:
+            del self.by_result[result]
+        self.pending.discard(app_id)
+        days = self._days.pop(app_id, None)
+        if days is not None:
+            self.decision_sum -= days
+            self.decision_count -= 1
+
+    def _on_registry_event(self, event, old, new):
+        if event == "reset":
+            self._rebuild()
+            return
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            if new is not None:
+                self._add(new)
+
+    #Read API
+    def count(self, result):
+        return self.by_result.get(result, 0)
+
+    @property
+    def awaiting(self):
+        return len(self.pending)
+
+    def average_decision_days(self):
+        return self.decision_sum / self.decision_count if self.decision_count else None
+
+    def summary(self):
+        with self._lock:
+            return {"total": self.total, **{r: self.count(r) for r in RESULT_KEYWORDS},
+                    "awaiting": self.awaiting, "average_decision_days": self.average_decision_days()}
+
+    @staticmethod
+    def recompute(registry):
+        """The same totals as summary(), by a full scan of the registry."""
+        days = [d for d in (decision_days(app) for app in registry) if d is not None]
+        counts = {r: registry.count("result", r) for r in RESULT_KEYWORDS}
+        return {"total": len(registry), **counts,
+                "awaiting": sum(counts[r] for r in InsightsAggregator.AWAITING_RESULTS),
+                "average_decision_days": sum(days) / len(days) if days else None}
+
+
+#Career guidance parsing
+
+CAREER_HEADER_PATTERN = r"^(\d\.\s+[^.]+?\s*\.)"
+
+def extract_career_sections(text):
+    """Splits a complete career response into {title: content} on its "N. Title." headers."""
+    matches = list(re.finditer(CAREER_HEADER_PATTERN, text, re.MULTILINE))
+    sections = {}
+    for i, match in enumerate(matches):
+        start = match.end()
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        header = match.group(1).strip()
+        title = re.sub(r"^\d\.\s+", "", header).rstrip(" .")
+        content = text[start:end].strip()
+        sections[title] = content
+    return sections
+
+
+#Each career section is written from only the profile fields it depends on, so
+#it is served from LLM_CACHE until one of those fields changes
+CAREER_SECTIONS = (
+    ("Ideal Career Paths", ("skills", "interests", "extracurriculars", "résumé (optional)"),
+     "Have at least 5 career paths."),
+    ("Recommended College Majors", ("skills", "interests", "classes taken"),
+     "Have at least 5 recommended college majors."),
+    ("Best Universities for Recommended Majors", ("interests", "classes taken", "gpa"),
+     "Have at least 10 universities."),
+    ("Preparation Roadmap", ("skills", "interests", "classes taken", "gpa", "extracurriculars", "résumé (optional)"),
+     ""),
+)
+CAREER_FIELD_LABELS = {
+    "skills": "Skills",
+    "interests": "Interests",
+    "classes taken": "Classes Taken",
+    "gpa": "GPA",
+    "extracurriculars": "Extracurriculars",
+    "résumé (optional)": "Résumé Info",
+}
+
+
+def career_section_prompt(title, fields, instruction, profile):
+    profile_text = "\n".join(f"{CAREER_FIELD_LABELS[f]}: {profile.get(f) or 'N/A'}" for f in fields)
+    return f"""
+You are an elite AI career counselor helping a high school student explore future opportunities. Be realistic. No bold words.
+Write only the "{title}" section of their guidance as JSON: a short overview, then one item per recommendation
+with its name and a thorough, detailed explanation in details. Do not include other sections.
+
+Profile:
+{profile_text}
+No bold words or letters. {instruction}
+"""
+
+
+#Schema-constrained output for a career section, so no header or bullet scraping is needed
+CAREER_SECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overview": {"type": "string"},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "details": {"type": "string"},
+                },
+                "required": ["name", "details"],
+            },
+        },
+    },
+    "required": ["overview", "items"],
+}
+CAREER_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": CAREER_SECTION_SCHEMA,
+}
+CAREER_BULLET = "       • "
+
+
+def parse_career_section(text):
+    """Validates one structured career section; raises ValueError if it does not match the schema."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Career section is not valid JSON: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+        raise ValueError("Career section is missing its items.")
+    items = []
+    for item in data["items"]:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str) \
+                or not isinstance(item.get("details"), str):
+            raise ValueError("Career section item is missing a name or details.")
+        if item["name"].strip():
+            items.append({"name": item["name"].strip(), "details": item["details"].strip()})
+    if not items:
+        raise ValueError("Career section has no items.")
+    overview = data.get("overview")
+    return {"overview": overview.strip() if isinstance(overview, str) else "", "items": items}
+
+
+def render_career_section(section):
+    lines = [section["overview"]] if section["overview"] else []
+    lines += [f"{CAREER_BULLET}{item['name']}: {item['details']}" for item in section["items"]]
+    return "\n".join(lines)
+
+
+def generate_career_sections(profile, on_event=None, bypass_cache=False, cancel_token=None,
+                             priority=PRIORITY_INTERACTIVE):
+    """
+    Generates the career sections concurrently as schema-constrained JSON.
+    Sections whose profile fields are unchanged come back from the cache
+    immediately; only invalidated ones reach the model, and a section that
+    fails validation is asked for again on its own. on_event gets
+    ("section", title) for every section up front in order, then
+    ("content", title, text) as each section completes. Returns {title: content}.
+    """
+    on_event = on_event or (lambda event: None)
+    for title, _, _ in CAREER_SECTIONS:
+        on_event(("section", title))
+
+    def write(title, fields, instruction, token):
+        prompt = career_section_prompt(title, fields, instruction, profile)
+
+        def ask(bypass):
+            #Validated before caching, so an invalid reply is never served again
+            return parse_career_section(generate_text(
+                prompt, feature="career_section", bypass_cache=bypass, generation_config=CAREER_GENERATION_CONFIG,
+                cancel_token=token, validate=parse_career_section))
+        try:
+            section = ask(bypass_cache)
+        except InvalidResponseError as e:
+            print(f"Career section '{title}' failed validation, asking again: {e}")
+            section = ask(True)
+        content = render_career_section(section)
+        on_event(("content", title, content))
+        return title, content
+
+    results = run_concurrently([lambda token, spec=spec: write(*spec, token) for spec in CAREER_SECTIONS],
+                               cancel_token=cancel_token, priority=priority)
+    return dict(results)
+
+
+def join_career_sections(sections):
+    """Inverse of extract_career_sections, used for the stored history record."""
+    return "\n\n".join(f"{i}. {title}.\n{content}" for i, (title, content) in enumerate(sections.items(), 1))
+
+
+#Card shadows (one pre-blurred nine-slice pixmap per style, shared by every card)
+
+class CardShadow:
+    """
+    Drop shadow for rounded cards. The blurred shape is rendered once per
+    (radius, blur, color) and stretched as a nine-slice, so a shadow costs
+    nine drawPixmap calls instead of an offscreen blur on every repaint.
+    """
+    _cache = {}
+
+    @classmethod
+    def get(cls, radius=12, blur=20, color=QColor(0, 0, 0, 80)):
+        key = (radius, blur, QColor(color).rgba())
+        shadow = cls._cache.get(key)
+        if shadow is None:
+            shadow = cls._cache[key] = cls(radius, blur, QColor(color))
+        return shadow
+
+    def __init__(self, radius, blur, color):
+        self.radius = radius
+        self.blur = blur
+        #Corner slice covers the blur outside the edge, the rounding and the blur falling off inside it
+        self.corner = radius + 2 * blur
+        self.pixmap = self._render(color)
+
+    def _render(self, color):
+        size = 2 * self.corner + 1
+        shape = QPixmap(size, size)
+        shape.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(shape)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(QRectF(self.blur, self.blur, size - 2 * self.blur, size - 2 * self.blur),
+                                self.radius, self.radius)
+        painter.end()
+        if self.blur <= 0:
+            return shape
+        #Same blur QGraphicsDropShadowEffect uses, applied once
+        scene = QGraphicsScene()
+        item = scene.addPixmap(shape)
+        effect = QGraphicsBlurEffect()
+        effect.setBlurRadius(self.blur)
+        effect.setBlurHints(QGraphicsBlurEffect.BlurHint.QualityHint)
+        item.setGraphicsEffect(effect)
+        blurred = QPixmap(size, size)
+        blurred.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(blurred)
+        scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+        painter.end()
+        return blurred
+
+    def paint(self, painter, rect, dx=0, dy=0):
+        """Paints the shadow of a card occupying rect, shifted by (dx, dy)."""
+        target = QRectF(rect).adjusted(dx - self.blur, dy - self.blur, dx + self.blur, dy + self.blur)
+        corner = min(self.corner, target.width() / 2, target.height() / 2)
+        size = self.pixmap.width()
+        xs = (target.left(), target.left() + corner, target.right() - corner, target.right())
+        ys = (target.top(), target.top() + corner, target.bottom() - corner, target.bottom())
+        src = (0, self.corner, size - self.corner, size)
+        for i in range(3):
+            for j in range(3):
+                dest = QRectF(xs[i], ys[j], xs[i + 1] - xs[i], ys[j + 1] - ys[j])
+                if dest.width() > 0 and dest.height() > 0:
+                    painter.drawPixmap(dest, self.pixmap,
+                                       QRectF(src[i], src[j], src[i + 1] - src[i], src[j + 1] - src[j]))
 
 
 #Supporting UI Components (SlideCard, CardHeader, ExpandedCard)
@@ -281,22 +2516,19 @@ class SlideCard(QWidget):
         self.anim.setDuration(400)
         self.anim.setEasingCurve(QEasingCurve(QEasingCurve.Type.InOutQuad))
 
-        self.shadow = QGraphicsDropShadowEffect(self)
-        self.shadow.setBlurRadius(0)
-        self.shadow.setOffset(0, 0)
-        self.shadow.setColor(QColor(0, 0, 0, 180))
-        self.setGraphicsEffect(self.shadow)
-
     def mousePressEvent(self, event):
         self.clicked.emit()
 
     def enterEvent(self, event):
-        self.shadow.setBlurRadius(20)
-        self.shadow.setOffset(0, 4)
+        #Only the card under the cursor pays for an offscreen blur
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(20)
+        shadow.setOffset(0, 4)
+        shadow.setColor(QColor(0, 0, 0, 180))
+        self.setGraphicsEffect(shadow)
 
     def leaveEvent(self, event):
-        self.shadow.setBlurRadius(0)
-        self.shadow.setOffset(0, 0)
+        self.setGraphicsEffect(None)
 
     def toggle(self, expand: bool):
         self.expanded = expand
@@ -321,12 +2553,23 @@ class CardHeader(QWidget):
         layout = QVBoxLayout(self)
         label = QLabel(f"<b>{title}</b>")
         label.setStyleSheet("color: white;")
-        summary_label = QLabel(summary)
-        summary_label.setStyleSheet("color: #ccc;")
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: #ccc;")
+        self.summary_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(label)
+        layout.addWidget(self.summary_label)
         self.setFixedSize(280, 80)
         label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("background: rgba(255,255,255,0.08); border-radius: 8px;")
+        self.set_summary(summary)
+
+    def set_summary(self, summary):
+        #One elided line so the header keeps its fixed size; the full sentence is in the tooltip
+        margins = self.layout().contentsMargins()
+        width = self.width() - margins.left() - margins.right()
+        self.summary_label.setText(self.summary_label.fontMetrics().elidedText(
+            summary, Qt.TextElideMode.ElideRight, width))
+        self.summary_label.setToolTip(summary)
 
     def mousePressEvent(self, event):
         self.clicked.emit()
@@ -348,6 +2591,7 @@ class ExpandedCard(QWidget):
         layout.addWidget(label, alignment=Qt.AlignmentFlag.AlignTop)
 
         content_label = QLabel(content)
+        self.content_label = content_label
         content_label.setStyleSheet("color: white;")
         content_label.setWordWrap(True)
         content_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -365,9 +2609,6 @@ import os
 import pickle
 import threading
 from datetime import datetime
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from PyQt6.QtCore import pyqtSignal, QThread, QObject
 from PyQt6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QLabel, QPushButton
 
@@ -386,7 +2627,7 @@ class GmailWorker(QObject):
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 try:
-                    creds.refresh(Request())
+                    creds.refresh(google_auth_request())
                 except Exception as e:
                     self.error.emit(str(e))
                     return
@@ -399,9 +2640,7 @@ class GmailWorker(QObject):
                         self.error.emit(
                             f"Gmail credentials not found at path: {credentials_path}. Check your .env file.")
                         return
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        credentials_path, SCOPES
-                    )
+                    flow = gmail_oauth_flow(credentials_path, SCOPES)
                 try:
                     creds = flow.run_local_server(port=0)
                 except Exception as e:
@@ -411,7 +2650,7 @@ class GmailWorker(QObject):
                 pickle.dump(creds, token)
         # Test api
         try:
-            service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+            service = gmail_service(creds)
             service.users().getProfile(userId="me").execute()
             self.success.emit()
         except Exception as e:
@@ -510,6 +2749,82 @@ class GmailAuthPanel(QDialog):
         self.status_label.setText("Connection failed.")
         self.auth_button.setEnabled(True)
         QMessageBox.critical(self, "Gmail Connection Error", msg)
+
+#LLM Diagnostics Panel (Ctrl+Shift+D)
+class LLMDiagnosticsPanel(QDialog):
+    COLUMNS = ("Feature", "Calls", "OK", "Cache hits", "Errors", "Cancelled",
+               "p50 (s)", "p90 (s)", "p99 (s)", "TTFT p50 (s)", "TTFT p90 (s)", "Prompt tok", "Output tok")
+
+    def __init__(self, telemetry, parent=None):
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self.setWindowTitle("LLM Diagnostics")
+        self.resize(1000, 360)
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+        buttons = QHBoxLayout()
+        self.summary_label = QLabel()
+        buttons.addWidget(self.summary_label)
+        buttons.addStretch()
+        for text, slot in (("Refresh", self.refresh), ("Export JSONL…", self.export_jsonl),
+                           ("Export Prometheus…", self.export_prometheus), ("Close", self.close)):
+            btn = QPushButton(text)
+            btn.clicked.connect(slot)
+            buttons.addWidget(btn)
+        layout.addLayout(buttons)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(2000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    @staticmethod
+    def _fmt(value):
+        return "-" if value is None else f"{value:.2f}"
+
+    def refresh(self):
+        summary = self.telemetry.summary()
+        self.table.setRowCount(len(summary))
+        for row, (feature, stats) in enumerate(summary.items()):
+            values = [feature, stats["calls"], stats["ok"], stats["cache_hit"], stats["error"], stats["cancelled"],
+                      *(self._fmt(stats["wall"][q]) for q in LLM_TELEMETRY_QUANTILES),
+                      self._fmt(stats["ttft"][0.5]), self._fmt(stats["ttft"][0.9]),
+                      stats["prompt_tokens"], stats["output_tokens"]]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.table.resizeColumnsToContents()
+        total = sum(stats["calls"] for stats in summary.values())
+        self.summary_label.setText(f"{total} calls recorded")
+
+    def _export(self, title, default_name, file_filter, writer):
+        path, _ = QFileDialog.getSaveFileName(self, title, default_name, file_filter)
+        if not path:
+            return
+        try:
+            writer(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def export_jsonl(self):
+        self._export("Export LLM telemetry", "llm_telemetry.jsonl", "JSON Lines (*.jsonl)",
+                     self.telemetry.export_jsonl)
+
+    def export_prometheus(self):
+        self._export("Export Prometheus metrics", "llm_metrics.prom", "Prometheus text (*.prom *.txt)",
+                     self.telemetry.export_prometheus)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
 #ApplicationEntryPanel Class
 class ApplicationEntryPanel(QWidget):
     app_saved = pyqtSignal(dict)
@@ -779,6 +3094,271 @@ class ApplicationEntryPanel(QWidget):
             print("Auto-monitor disabled. Saving application.")
             self.app_saved.emit(app_data)
             self.clear_form()
+
+
+#Application dashboard model/view (painted cards, only visible rows are drawn)
+
+RESULT_COLORS = {
+    "Accepted": "#4CAF50",
+    "Rejected": "#FF6347",
+    "Waitlisted": "#FFA500",
+    "Deferred": "#87CEEB",
+}
+
+class ApplicationListModel(QAbstractListModel):
+    """
+    List model over an ApplicationRegistry, ordered by school name. Registry
+    events become single-row inserts, removes and dataChanged, so the view
+    only re-lays out and repaints what actually changed.
+    """
+    AppRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, registry=None, parent=None):
+        super().__init__(parent)
+        self.registry = None
+        self._keys = []  #sorted (school_name, id)
+        self.set_registry(registry if registry is not None else ApplicationRegistry())
+
+    @staticmethod
+    def _key(app):
+        return (app.get("school_name") or "", app["id"])
+
+    def set_registry(self, registry):
+        if registry is self.registry:
+            return
+        if self.registry is not None:
+            self.registry.remove_listener(self._on_registry_event)
+        self.registry = registry
+        registry.add_listener(self._on_registry_event)
+        self._reset()
+
+    def _reset(self):
+        self.beginResetModel()
+        self._keys = sorted(self._key(app) for app in self.registry)
+        self.endResetModel()
+
+    def _row(self, key):
+        row = bisect.bisect_left(self._keys, key)
+        return row if row < len(self._keys) and self._keys[row] == key else None
+
+    def row_of(self, app_id):
+        app = self.registry.get(app_id)
+        return self._row(self._key(app)) if app else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._keys):
+            return None
+        app = self.registry.get(self._keys[index.row()][1])
+        if app is None:
+            return None
+        if role == self.AppRole:
+            return app
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return app.get("school_name", "N/A")
+        return None
+
+    def _insert(self, key):
+        row = bisect.bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self.endInsertRows()
+
+    def _remove(self, key):
+        row = self._row(key)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._keys.pop(row)
+        self.endRemoveRows()
+
+    def _on_registry_event(self, event, old, new):
+        if event == "reset":
+            self._reset()
+        elif event == "added":
+            self._insert(self._key(new))
+        elif event == "removed":
+            self._remove(self._key(old))
+        elif event == "updated":
+            old_key, new_key = self._key(old), self._key(new)
+            if old_key != new_key:
+                self._remove(old_key)
+                self._insert(new_key)
+                return
+            row = self._row(new_key)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+
+class ApplicationCardDelegate(QStyledItemDelegate):
+    """
+    Paints an application card and hit-tests its actions (Auto Monitor
+    toggle, Remove, View Portal, Enter Decision Result) instead of building
+    a widget tree per application.
+    """
+    toggle_requested = pyqtSignal(str, bool)
+    remove_requested = pyqtSignal(str)
+    decision_requested = pyqtSignal(str)
+
+    CARD_HEIGHT = 300
+    MARGIN = 10
+    PADDING = 20
+    INFO_FIELDS = (("major", "Major"), ("application_type", "Type"), ("submission_date", "Submitted"),
+                   ("deadline", "Deadline"), ("last_checked", "Last Monitored"))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.card_size = QSize(380, self.CARD_HEIGHT)
+        self.title_font = self._font(15, bold=True)
+        self.result_font = QFont("Segoe UI", 14, QFont.Weight.Bold)
+        self.body_font = self._font(13)
+        self.button_font = self._font(13, bold=True)
+
+    @staticmethod
+    def _font(pixels, bold=False):
+        font = QFont("Segoe UI")
+        font.setPixelSize(pixels)
+        font.setBold(bold)
+        return font
+
+    def sizeHint(self, option, index):
+        return self.card_size
+
+    @staticmethod
+    def needs_decision(app):
+        return app.get("status") == "Decision Released" and app.get("result", "Pending") in ("Pending", "Deferred", "Waitlisted")
+
+    def layout(self, rect, app):
+        """Rects for every part of the card; shared by paint() and hit-testing."""
+        card = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        inner = card.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        parts = {"card": card}
+        y = inner.top()
+        status_width = min(140, inner.width() // 3)
+        parts["school"] = QRect(inner.left(), y, inner.width() - status_width - 8, 24)
+        parts["status"] = QRect(inner.right() - status_width, y, status_width, 24)
+        y += 30
+        result = app.get("result", "Pending")
+        if result != "Pending" and app.get("status") == "Decision Released":
+            parts["result"] = QRect(inner.left(), y, inner.width(), 26)
+            y += 30
+        parts["info"] = QRect(inner.left(), y, inner.width(), 20 * len(self.INFO_FIELDS))
+        y += 20 * len(self.INFO_FIELDS) + 4
+        if app.get("portal_link"):
+            parts["portal"] = QRect(inner.left(), y, 90, 20)
+        bottom = inner.bottom()
+        if self.needs_decision(app):
+            parts["decision"] = QRect(inner.left(), bottom - 32, inner.width(), 32)
+            bottom -= 40
+        parts["toggle"] = QRect(inner.left(), bottom - 30, 130, 30)
+        parts["remove"] = QRect(inner.right() - 100, bottom - 30, 100, 30)
+        return parts
+
+    def paint(self, painter, option, index):
+        app = index.data(ApplicationListModel.AppRole)
+        if not app:
+            return
+        parts = self.layout(option.rect, app)
+        card = parts["card"]
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        #Shadow stays inside the cell so un-hovering repaints it away
+        painter.setClipRect(option.rect)
+        if hovered:
+            CardShadow.get(12, 20).paint(painter, card, 5, 5)
+        else:
+            CardShadow.get(12, 1).paint(painter, card, 1, 1)
+        painter.setClipping(False)
+        painter.setBrush(QColor("#1c1c1c"))
+        painter.drawRoundedRect(QRectF(card), 12, 12)
+
+        result = app.get("result", "Pending")
+        color = QColor(RESULT_COLORS.get(result, "#ADD8E6"))
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("#f0f0f0"))
+        school = f"🎓 {app.get('school_name', 'N/A')}"
+        painter.drawText(parts["school"], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         painter.fontMetrics().elidedText(school, Qt.TextElideMode.ElideRight, parts["school"].width()))
+        painter.setPen(color)
+        status = app.get("status", "Unknown")
+        painter.drawText(parts["status"], Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                         painter.fontMetrics().elidedText(status, Qt.TextElideMode.ElideRight, parts["status"].width()))
+        if "result" in parts:
+            painter.setFont(self.result_font)
+            painter.drawText(parts["result"], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             f"Result: {result}")
+
+        painter.setFont(self.body_font)
+        painter.setPen(QColor("#CCC"))
+        info = parts["info"]
+        for i, (key, label) in enumerate(self.INFO_FIELDS):
+            line = QRect(info.left(), info.top() + 20 * i, info.width(), 20)
+            painter.drawText(line, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             painter.fontMetrics().elidedText(f"{label}: {app.get(key, 'N/A')}",
+                                                              Qt.TextElideMode.ElideRight, line.width()))
+        if "portal" in parts:
+            link_font = QFont(self.body_font)
+            link_font.setUnderline(True)
+            painter.setFont(link_font)
+            painter.setPen(QColor("#61dafb"))
+            painter.drawText(parts["portal"], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, "View Portal")
+
+        toggle = parts["toggle"]
+        check = QStyleOptionButton()
+        check.rect = QRect(toggle.left(), toggle.center().y() - 8, 16, 16)
+        check.state = QStyle.StateFlag.State_Enabled | (
+            QStyle.StateFlag.State_On if app.get("auto_monitor", False) else QStyle.StateFlag.State_Off)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, check, painter, option.widget)
+        painter.setFont(self.body_font)
+        painter.setPen(QColor("#E0E0E0"))
+        painter.drawText(toggle.adjusted(24, 0, 0, 0), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         "Auto Monitor")
+
+        painter.setFont(self.button_font)
+        self._paint_button(painter, parts["remove"], "#d9534f", "🗑 Remove")
+        if "decision" in parts:
+            self._paint_button(painter, parts["decision"], "#007bff", "Enter Decision Result")
+        painter.restore()
+
+    @staticmethod
+    def _paint_button(painter, rect, color, text):
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(QRectF(rect), 6, 6)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+    def action_at(self, rect, app, pos):
+        parts = self.layout(rect, app)
+        for action in ("toggle", "remove", "portal", "decision"):
+            if action in parts and parts[action].contains(pos):
+                return action
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return super().editorEvent(event, model, option, index)
+        app = index.data(ApplicationListModel.AppRole)
+        if not app:
+            return False
+        action = self.action_at(option.rect, app, event.position().toPoint())
+        if action == "toggle":
+            self.toggle_requested.emit(app["id"], not app.get("auto_monitor", False))
+        elif action == "remove":
+            self.remove_requested.emit(app["id"])
+        elif action == "decision":
+            self.decision_requested.emit(app["id"])
+        elif action == "portal":
+            QDesktopServices.openUrl(QUrl(app["portal_link"]))
+        return action is not None
+
+
 #ApplicationDashboardPanel Class
 
 class ApplicationDashboardPanel(QWidget):
@@ -788,13 +3368,14 @@ class ApplicationDashboardPanel(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.applications = []
+        self.applications = ApplicationRegistry()
+        self.insights = self.applications.insights()
         self.init_ui()
         self.apply_styles()
         self.resize_timer = QTimer(self)
         self.resize_timer.setInterval(100)
         self.resize_timer.setSingleShot(True)
-        self.resize_timer.timeout.connect(self._recalculate_card_layout)
+        self.resize_timer.timeout.connect(self._update_card_grid)
         self.ai_response_ready.connect(self._display_ai_response)
         self.ai_loading_finished.connect(self._stop_ai_loading)
 
@@ -884,18 +3465,36 @@ class ApplicationDashboardPanel(QWidget):
             insights_layout.addWidget(label)
         insights_layout.addStretch(1)
         main_layout.addWidget(self.insights_area)
-        #Scrollable Application Cards Grid
-        self.dashboard_scroll_area = QScrollArea(self)
-        self.dashboard_scroll_area.setWidgetResizable(True)
-        from PyQt6.QtCore import Qt
-        self.dashboard_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.dashboard_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.dashboard_container = QWidget()
-        self.dashboard_grid_layout = QGridLayout(self.dashboard_container)
-        self.dashboard_grid_layout.setContentsMargins(10, 10, 10, 10)
-        self.dashboard_grid_layout.setSpacing(20)
-        self.dashboard_scroll_area.setWidget(self.dashboard_container)
-        main_layout.addWidget(self.dashboard_scroll_area, stretch=1)
+        #Application cards: painted by a delegate, only visible rows are laid out and drawn
+        self.no_apps_label = QLabel("No applications tracked yet.")
+        self.no_apps_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.no_apps_label.setStyleSheet("color: #999999; font-size: 14px; padding: 50px;")
+        main_layout.addWidget(self.no_apps_label)
+        self.card_model = ApplicationListModel(self.applications, self)
+        self.card_delegate = ApplicationCardDelegate(self)
+        self.card_delegate.toggle_requested.connect(self.toggle_monitor)
+        self.card_delegate.remove_requested.connect(self._remove_application)
+        self.card_delegate.decision_requested.connect(self._prompt_decision_result)
+        self.dashboard_view = QListView(self)
+        self.dashboard_view.setViewMode(QListView.ViewMode.IconMode)
+        self.dashboard_view.setFlow(QListView.Flow.LeftToRight)
+        self.dashboard_view.setWrapping(True)
+        self.dashboard_view.setMovement(QListView.Movement.Static)
+        self.dashboard_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.dashboard_view.setUniformItemSizes(True)
+        self.dashboard_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.dashboard_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.dashboard_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.dashboard_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.dashboard_view.setMouseTracking(True)
+        self.dashboard_view.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.dashboard_view.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.dashboard_view.setItemDelegate(self.card_delegate)
+        self.dashboard_view.setModel(self.card_model)
+        for sig in (self.card_model.rowsInserted, self.card_model.rowsRemoved, self.card_model.modelReset):
+            sig.connect(self._update_empty_state)
+        main_layout.addWidget(self.dashboard_view, stretch=1)
+        self._update_empty_state()
         #ai Assistant Section
         self.ai_question_frame = QFrame(self)
         self.ai_question_frame.setObjectName("AIQuestionFrame")
@@ -953,53 +3552,39 @@ class ApplicationDashboardPanel(QWidget):
         if not question:
             self.ai_response_ready.emit("Please enter a question.")
             return
+        local_answer = answer_dashboard_question(self.applications, question)
+        if local_answer is not None:
+            self.ai_response_ready.emit(local_answer)
+            self._stop_ai_loading()
+            return
         self.ai_question_input.setEnabled(False)
         self.ai_response_ready.emit("Thinking...")
         if self.ai_loading_movie:
             self.ai_loading_label.setVisible(True)
             self.ai_loading_movie.start()
-        app_summary = []
-        for app in self.applications:
-            summary = {
-                "school_name": app.get("school_name", "N/A"),
-                "status": app.get("status", "Unknown"),
-                "result": app.get("result", "Pending"),
-                "major": app.get("major", "N/A"),
-                "deadline": app.get("deadline", "N/A"),
-                "submission_date": app.get("submission_date", "N/A"),
-            }
-            app_summary.append(summary)
-        applications_text = json.dumps(app_summary, indent=2)
+        applications_text = build_dashboard_context(self.applications, question)
         panel_instance = self  #Get a safe reference
 
         def worker():
             try:
                 prompt = (
                     f"You are an AI assistant designed to help analyze college applications. "
-                    f"Here is a list of my current college applications:\n\n"
+                    f"Here is a summary of my current college applications:\n\n"
                     f"{applications_text}\n\n"
                     f"Based on this data, please answer the following question concisely and clearly: '{question}'\n"
                     f"Keep your answer to a maximum of 1-3 sentences. Avoid conversational filler. Your response should be addressing the applicant directly."
                 )
-                current_gemini_api_key = GEMINI_KEY
-                if not current_gemini_api_key:
-                    panel_instance.ai_response_ready.emit(
-                        "Error: Gemini API Key (GEMINI_API_KEY) is not set in environment variables."
-                    )
-                    return 
-                genai.configure(api_key=current_gemini_api_key)
-                #Ensure model is not None before calling
-                if model is None:
+                #Ensure a backend is available before calling
+                if LLM_BACKEND is None:
                     panel_instance.ai_response_ready.emit("Error: Gemini model not initialized. API key missing.")
                     return
-                response = model.generate_content(prompt)
-                ai_response = response.text.strip()
+                ai_response = generate_text(prompt, feature="dashboard_qa").strip()
                 panel_instance.ai_response_ready.emit(ai_response)
             except Exception as e:
                 panel_instance.ai_response_ready.emit(f"Error: Could not get AI response. {e}")
             finally:
                 panel_instance.ai_loading_finished.emit()
-        threading.Thread(target=worker).start()
+        LLM_SERVICE.submit(worker, feature="dashboard_qa")
 
     def _stop_ai_loading(self):
         if self.ai_loading_movie:
@@ -1019,22 +3604,6 @@ class ApplicationDashboardPanel(QWidget):
             border: 1px solid #333;
             border-radius: 10px;
         }
-        #SchoolName {
-            font-size: 15px;
-            font-weight: bold;
-            color: #f0f0f0;
-        }
-        #StatusLabel {
-            font-size: 13px;
-            font-weight: bold;
-        }
-        #Link {
-            color: #61dafb;
-        }
-        #ApplicationCard {
-            background-color: #1c1c1c;
-            border-radius: 12px;
-        }
         """)
 
     def _create_insight_label(self, text):
@@ -1047,188 +3616,32 @@ class ApplicationDashboardPanel(QWidget):
         self.resize_timer.start()
         super().resizeEvent(event)
 
-    def _recalculate_card_layout(self):
-        # disconnect and delete every widget
-        for i in reversed(range(self.dashboard_grid_layout.count())):
-            item = self.dashboard_grid_layout.itemAt(i)
-            if item and item.widget():
-                w = item.widget()
-                try:
-                    w.disconnect()  # break all Qt signals
-                except Exception:
-                    pass  
-                w.deleteLater()  
-            self.dashboard_grid_layout.removeItem(item)
-        #Responsive column count
-        max_cols = max(1, self.width() // 380)
-        min_card_height = 260
-        if not self.applications:
-            no_apps_label = QLabel("No applications tracked yet.")
-            no_apps_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_apps_label.setStyleSheet("color: #999999; font-size: 14px; padding: 50px;")
-            self.dashboard_grid_layout.addWidget(no_apps_label, 0, 0, 1, max_cols)
-            self.dashboard_grid_layout.setRowStretch(0, 1)
-            self.dashboard_grid_layout.setRowMinimumHeight(0, min_card_height)
-            self._update_insights()
-            return
-        #populate
-        row, col = 0, 0
-        for app_data in sorted(self.applications, key=lambda x: x.get("school_name", "")):
-            card = self._create_application_card(app_data)
-            self.dashboard_grid_layout.addWidget(card, row, col)
-            self.dashboard_grid_layout.setRowMinimumHeight(row, min_card_height)
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
-        #spacer
-        self.dashboard_grid_layout.addItem(
-            QSpacerItem(0, 0, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding),
-            row + 1, 0, 1, max_cols
-        )
-        self.dashboard_container.adjustSize()
-        self._update_insights()
-    @pyqtSlot(list)
-    def update_dashboard(self, applications: list):
+    def _update_card_grid(self):
+        """Re-flows grid cells for the current width; cards are painted, so nothing is rebuilt."""
+        #Leave room for the scroll bar so a bar appearing doesn't push the last column onto a new row
+        viewport_width = (self.dashboard_view.maximumViewportSize().width()
+                          - self.dashboard_view.style().pixelMetric(QStyle.PixelMetric.PM_ScrollBarExtent))
+        cols = max(1, viewport_width // 380)
+        #IconMode wraps when a cell would touch the right edge, hence the spare pixel
+        cell = QSize(max(1, (viewport_width - 1) // cols), ApplicationCardDelegate.CARD_HEIGHT)
+        if self.dashboard_view.gridSize() != cell:
+            self.card_delegate.card_size = cell
+            self.dashboard_view.setGridSize(cell)
+
+    def _update_empty_state(self, *args):
+        empty = self.card_model.rowCount() == 0
+        self.no_apps_label.setVisible(empty)
+        self.dashboard_view.setVisible(not empty)
+
+    @pyqtSlot(object)
+    def update_dashboard(self, applications):
+        #The model follows registry events itself; this only switches registries
         self.applications = applications
-        self._recalculate_card_layout()
+        self.card_model.set_registry(applications)
+        self.insights = applications.insights()
+        self._update_card_grid()
         self._update_insights()
 
-    def _create_application_card(self, app_data):
-        card = QFrame()
-        card.setObjectName("ApplicationCard")
-        card.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.MinimumExpanding)
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(1)
-        shadow.setXOffset(1)
-        shadow.setYOffset(1)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        card.setGraphicsEffect(shadow)
-        card.hover_anim = QPropertyAnimation(shadow, b"blurRadius")
-        card.hover_anim.setDuration(150)
-        card.hover_anim.setEasingCurve(QEasingCurve.Type.OutQuad)
-        card.offset_anim_x = QPropertyAnimation(shadow, b"xOffset")
-        card.offset_anim_y = QPropertyAnimation(shadow, b"yOffset")
-        card.offset_anim_x.setDuration(150)
-        card.offset_anim_y.setDuration(150)
-        card.offset_anim_x.setEasingCurve(QEasingCurve.Type.OutQuad)
-        card.offset_anim_y.setEasingCurve(QEasingCurve.Type.OutQuad)
-        def enter_event(event):
-            card.hover_anim.setStartValue(shadow.blurRadius())
-            card.hover_anim.setEndValue(20)
-            card.offset_anim_x.setStartValue(shadow.xOffset())
-            card.offset_anim_x.setEndValue(5)
-            card.offset_anim_y.setStartValue(shadow.yOffset())
-            card.offset_anim_y.setEndValue(5)
-            card.hover_anim.start()
-            card.offset_anim_x.start()
-            card.offset_anim_y.start()
-        def leave_event(event):
-            card.hover_anim.setStartValue(shadow.blurRadius())
-            card.hover_anim.setEndValue(1)
-            card.offset_anim_x.setStartValue(shadow.xOffset())
-            card.offset_anim_x.setEndValue(1)
-            card.offset_anim_y.setStartValue(shadow.yOffset())
-            card.offset_anim_y.setEndValue(1)
-            card.hover_anim.start()
-            card.offset_anim_x.start()
-            card.offset_anim_y.start()
-        card.enterEvent = enter_event
-        card.leaveEvent = leave_event
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(20, 20, 20, 20)
-        layout.setSpacing(10)
-        top = QHBoxLayout()
-        school = QLabel(f"🎓 {app_data.get('school_name', 'N/A')}")
-        school.setObjectName("SchoolName")
-        school.setWordWrap(True)
-        top.addWidget(school, stretch=1)
-        result = app_data.get("result", "Pending")
-        status = app_data.get("status", "Unknown")
-        status_label = QLabel(status)
-        status_label.setObjectName("StatusLabel")
-        status_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop)
-        status_label.setWordWrap(True)
-        #Color coding
-        color_map = {
-            "Accepted": "#4CAF50",
-            "Rejected": "#FF6347",
-            "Waitlisted": "#FFA500",
-            "Deferred": "#87CEEB",
-        }
-        status_label.setStyleSheet(f"color: {color_map.get(result, '#ADD8E6')};")
-        top.addWidget(status_label)
-        layout.addLayout(top)
-        if result != "Pending" and status == "Decision Released":
-            res_label = QLabel(f"Result: <b>{result}</b>")
-            res_label.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-            res_label.setStyleSheet(status_label.styleSheet())
-            layout.addWidget(res_label)
-        #Core info
-        for key, label in {
-            "major": "Major",
-            "application_type": "Type",
-            "submission_date": "Submitted",
-            "deadline": "Deadline",
-            "last_checked": "Last Monitored"
-        }.items():
-            val = app_data.get(key, "N/A")
-            qlabel = QLabel(f"{label}: {val}")
-            qlabel.setStyleSheet("color: #CCC; font-size: 13px;")
-            qlabel.setWordWrap(True)
-            layout.addWidget(qlabel)
-        #Portal link
-        if app_data.get("portal_link"):
-            link = QLabel(f"<a href='{app_data['portal_link']}'>View Portal</a>")
-            link.setOpenExternalLinks(True)
-            link.setObjectName("Link")
-            link.setFont(QFont("Segoe UI", 13))
-            layout.addWidget(link)
-        #Auto monitor checkbox
-        mon_layout = QHBoxLayout()
-        #create the checkbox
-        toggle = QCheckBox("Auto Monitor")
-        toggle.setChecked(app_data.get("auto_monitor", False))
-        toggle.setStyleSheet("QCheckBox { color: #E0E0E0; font-size: 13px; }")
-        # store its ID instead of the widget 
-        toggle.setProperty("app_id", app_data["id"])
-        toggle.stateChanged.connect(
-            lambda state, aid=app_data["id"]: self.toggle_monitor(aid, bool(state))
-        )
-        mon_layout.addWidget(toggle)
-        mon_layout.addStretch(1)
-        #Delete button
-        delete_btn = QPushButton("🗑 Remove")
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #d9534f;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #c9302c;
-            }
-        """)
-        delete_btn.clicked.connect(lambda _, id=app_data.get("id"): self._remove_application(id))
-        mon_layout.addWidget(delete_btn)
-        layout.addLayout(mon_layout)
-        if status == "Decision Released" and result in ["Pending", "Deferred", "Waitlisted"]:
-            enter_btn = QPushButton("Enter Decision Result")
-            enter_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #007bff;
-                    color: white;
-                    padding: 8px 15px;
-                    border-radius: 5px;
-                    border: none;
-                }
-                QPushButton:hover { background-color: #0056b3; }
-            """)
-            enter_btn.clicked.connect(lambda: self._prompt_decision_result(app_data.get("id")))
-            layout.addWidget(enter_btn)
-        return card
-
     def _remove_application(self, app_id):
         """Ask for confirmation and, if accepted, delete the application."""
         reply = QMessageBox.question(
@@ -1243,29 +3656,19 @@ class ApplicationDashboardPanel(QWidget):
             self.app_updated.emit("delete", {"id": app_id})
 
     def _update_insights(self):
-        total = len(self.applications)
-        awaiting = sum(1 for a in self.applications if a.get("result") in ["Pending", "Deferred", "Waitlisted"])
-        accepted = sum(1 for a in self.applications if a.get("result") == "Accepted")
-        rejected = sum(1 for a in self.applications if a.get("result") == "Rejected")
-        waitlisted = sum(1 for a in self.applications if a.get("result") == "Waitlisted")
-        deferred = sum(1 for a in self.applications if a.get("result") == "Deferred")
+        insights = self.insights
+        total = insights.total
+        accepted = insights.count("Accepted")
+        rejected = insights.count("Rejected")
+        waitlisted = insights.count("Waitlisted")
+        deferred = insights.count("Deferred")
+        awaiting = insights.awaiting
         self.apps_submitted_label.setText(f"🔢 Apps Submitted: {total}")
         self.awaiting_decision_label.setText(f"🟢 Awaiting: {awaiting}")
         self.accepted_label.setText(f"✅ Accepted: {accepted}")
         self.rejected_label.setText(f"❌ Rejected: {rejected}")
-        decision_times = []
-        for app in self.applications:
-            sub = app.get("submission_date")
-            release_event = next((e for e in app.get("timeline", []) if e.get("event") == "Decision Released"), None)
-            if sub and release_event:
-                try:
-                    sub_date = datetime.strptime(sub, "%Y-%m-%d")
-                    dec_date = datetime.strptime(release_event.get("date"), "%Y-%m-%d")
-                    decision_times.append((dec_date - sub_date).days)
-                except Exception:
-                    pass
-        if decision_times:
-            avg_days = sum(decision_times) / len(decision_times)
+        avg_days = insights.average_decision_days()
+        if avg_days is not None:
             self.avg_time_label.setText(f"⏱️ Avg Decision Time: {avg_days:.1f} days")
         else:
             self.avg_time_label.setText("⏱️ Avg Decision Time: N/A")
@@ -1281,83 +3684,107 @@ class ApplicationDashboardPanel(QWidget):
         else:
             self.likeliest_outcome_label.setText("🎓 Next Likely: All decisions received!")
 
+#Feature pages are built on first visit; set PATHWISE_PREBUILD_PAGES=1 to build the rest while idle
+PREBUILD_PAGES = os.getenv("PATHWISE_PREBUILD_PAGES", "0") == "1"
+PREBUILD_DELAY_MS = 1500
+
+
 class CombinedApp(QMainWindow):
-    update_app_dashboard = pyqtSignal(list)
+    update_app_dashboard = pyqtSignal(object)
     explainer_response_ready = pyqtSignal(dict)
+    explainer_chunk_ready = pyqtSignal(int, str)
+    career_stream_event = pyqtSignal(int, object)
+    career_finished = pyqtSignal(int, str)
+    #Page attribute -> builder; each builder adds its page to self.stack
+    PAGE_BUILDERS = {
+        "career_ui": "build_career_ui",
+        "career_result_ui": "build_career_result_ui",
+        "explainer_ui": "build_explainer_ui",
+        "match_ui": "build_college_match_ui",
+        "application_tracker_ui": "build_application_tracker_ui",
+    }
+    #Top bar navigation: (mode, label, switch method)
+    NAV_MODES = (
+        ("career", "Career Counselor", "switch_to_career"),
+        ("explainer", "Academic Explainer", "switch_to_explainer"),
+        ("college_match", "College Match Engine", "switch_to_college_match"),
+        ("application_tracker", "📬 Application Tracker", "switch_to_application_tracker"),
+    )
+    NAV_BUTTON_STYLE = """
+        QPushButton {
+            padding: 8px;
+            border-radius: 8px;
+            background: #333;
+            color: white;
+            border: 1px solid #444;
+        }
+        QPushButton:hover {
+            background: #444;
+            border: 1px solid #555;
+        }
+        QPushButton:pressed {
+            background: #222;
+            border: 1px solid #333;
+        }
+    """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Pathwise – Career & Academic AI")
         self.resize(1200, 800)
         self.current_mode = "career"
-        self.history = self.load_history()  #For career mode
-        self.explainer_data = self.load_explainer_data()  #For explainer mode
+        self.persistence = PersistenceService()
+        self.requests = RequestTracker()
+        #Opened before the career log so compaction can drop stale search rows
+        with STARTUP_PROFILE.phase("open search index"):
+            self.search_index = SearchIndex()
+        with STARTUP_PROFILE.phase("load career history"):
+            self.history = self.load_history()  #For career mode
+        with STARTUP_PROFILE.phase("json: history.json"):
+            self.explainer_data = self.load_explainer_data()  #For explainer mode
         self.applications_db_file = "applications.json"  #DB file for applications
-        self.applications = self.load_applications()  #Load applications
+        with STARTUP_PROFILE.phase("json: applications.json"):
+            self.applications = self.load_applications()  #Load applications
+        if self.search_index.is_empty():
+            self.persistence.submit(self._rebuild_search_index)
         self.gmail_monitor = None
+        self.gmail_connected = os.path.exists(TOKEN_FILE)
         self.open_cards = []
-        self.load_theme()
-        self.load_fonts()
-        self.build_base_ui()
+        with STARTUP_PROFILE.phase("json: settings.json"):
+            self.load_theme()
+        with STARTUP_PROFILE.phase("fonts"):
+            self.load_fonts()
+        with STARTUP_PROFILE.phase("build_base_ui"):
+            self.build_base_ui()
+        with STARTUP_PROFILE.phase("apply_theme"):
+            self.apply_theme(self.current_theme)
         self.switch_to_career()
+        if PREBUILD_PAGES:
+            QTimer.singleShot(PREBUILD_DELAY_MS, self._prebuild_next_page)
+        self.diagnostics_panel = None
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.diagnostics_shortcut.activated.connect(self.show_llm_diagnostics)
         cip_path = "C:/Users/iqbal/Downloads/cip_codes.json"
         if os.path.exists(cip_path):
-            with open(cip_path, "r") as f:
+            with open(cip_path, "r") as f, STARTUP_PROFILE.phase("json: cip_codes.json"):
                 self.cip_list = json.load(f)
                 self.cip_titles = [item["title"] for item in self.cip_list]
         else:
             print(f"WARNING: cip_codes.json not found at {cip_path}. College matching by major may be limited.")
             self.cip_list = []
             self.cip_titles = []
-        self.app_entry_panel.is_gmail_connected = os.path.exists(TOKEN_FILE)
+
+    def show_llm_diagnostics(self):
+        if self.diagnostics_panel is None:
+            self.diagnostics_panel = LLMDiagnosticsPanel(LLM_TELEMETRY, self)
+        self.diagnostics_panel.show()
+        self.diagnostics_panel.raise_()
 
     def update_top_bar_buttons(self):
-        for i in reversed(range(self.top_bar.count())):
-            widget = self.top_bar.itemAt(i).widget()
-            if widget and widget != self.sectionLabel:
-                self.top_bar.removeWidget(widget)
-                widget.deleteLater()
-        self.top_bar.addStretch()
-        if self.current_mode != "career":
-            btn = QPushButton("Career Counselor")
-            btn.setFont(QFont("TypoRoundRegularDemo", 12))
-            btn.clicked.connect(self.switch_to_career)
-            self.top_bar.addWidget(btn)
-        if self.current_mode != "explainer":
-            btn = QPushButton("Academic Explainer")
-            btn.setFont(QFont("TypoRoundRegularDemo", 12))
-            btn.clicked.connect(self.switch_to_explainer)
-            self.top_bar.addWidget(btn)
-        if self.current_mode != "college_match":
-            btn = QPushButton("College Match Engine")
-            btn.setFont(QFont("TypoRoundRegularDemo", 12))
-            btn.clicked.connect(self.switch_to_college_match)
-            self.top_bar.addWidget(btn)
-        if self.current_mode != "application_tracker":
-            btn = QPushButton("📬 Application Tracker")
-            btn.setFont(QFont("TypoRoundRegularDemo", 12))
-            btn.clicked.connect(self.switch_to_application_tracker)
-            self.top_bar.addWidget(btn)
-        for i in range(self.top_bar.count()):
-            widget = self.top_bar.itemAt(i).widget()
-            if isinstance(widget, QPushButton):
-                widget.setFixedWidth(220)
-                widget.setStyleSheet("""
-                    QPushButton {
-                        padding: 8px;
-                        border-radius: 8px;
-                        background: #333;
-                        color: white;
-                        border: 1px solid #444;
-                    }
-                    QPushButton:hover {
-                        background: #444;
-                        border: 1px solid #555;
-                    }
-                    QPushButton:pressed {
-                        background: #222;
-                        border: 1px solid #333;
-                    }
-                """)
+        """Shows a nav button for every mode but the current one; the buttons are built once in build_base_ui."""
+        for mode, btn in self.nav_buttons.items():
+            btn.setChecked(mode == self.current_mode)
+            btn.setVisible(mode != self.current_mode)
 
     def load_theme(self):
         try:
@@ -1376,25 +3803,52 @@ class CombinedApp(QMainWindow):
         self.main_widget = QWidget()
         self.main_layout = QVBoxLayout(self.main_widget)
         self.setCentralWidget(self.main_widget)
-        self.top_bar = QHBoxLayout()
+        #One stylesheet on the bar styles every nav button
+        self.top_bar_widget = QWidget()
+        self.top_bar_widget.setStyleSheet(self.NAV_BUTTON_STYLE)
+        self.top_bar = QHBoxLayout(self.top_bar_widget)
+        self.top_bar.setContentsMargins(0, 0, 0, 0)
         self.sectionLabel = QLabel()
         self.sectionLabel.setStyleSheet("font-size: 18px; font-weight: bold; color: white;")
         self.top_bar.addWidget(self.sectionLabel)
-        self.main_layout.addLayout(self.top_bar)
+        self.top_bar.addStretch()
+        self.nav_buttons = {}
+        nav_font = QFont("TypoRoundRegularDemo", 12)
+        for mode, label, switch in self.NAV_MODES:
+            btn = QPushButton(label)
+            btn.setFont(nav_font)
+            btn.setFixedWidth(220)
+            btn.setCheckable(True)
+            btn.clicked.connect(getattr(self, switch))
+            self.top_bar.addWidget(btn)
+            self.nav_buttons[mode] = btn
+        self.main_layout.addWidget(self.top_bar_widget)
         self.stack = QStackedWidget()
-        self.build_career_result_ui()
-        self.build_career_ui()
-        self.build_explainer_ui()
-        self.build_college_match_ui()
-        self.build_application_tracker_ui()
         self.stack.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.main_layout.addWidget(self.stack)
         self.update_top_bar_buttons()
+
+    def _page(self, name):
+        """Returns a feature page, building it the first time it is needed."""
+        if not hasattr(self, name):
+            builder = self.PAGE_BUILDERS[name]
+            with STARTUP_PROFILE.phase(builder):
+                getattr(self, builder)()
+        return getattr(self, name)
+
+    def _prebuild_next_page(self):
+        #One page per timer tick so input stays responsive between builds
+        for name in self.PAGE_BUILDERS:
+            if not hasattr(self, name):
+                self._page(name)
+                QTimer.singleShot(0, self._prebuild_next_page)
+                return
+
     #Application Tracker UI & Logic
     def switch_to_application_tracker(self):
         self.current_mode = "application_tracker"
         self.sectionLabel.setText("Application Tracker")
-        self.stack.setCurrentWidget(self.application_tracker_ui)
+        self.stack.setCurrentWidget(self._page("application_tracker_ui"))
         self.update_top_bar_buttons()
         self.app_dashboard_panel.update_dashboard(self.applications)
 
@@ -1427,6 +3881,7 @@ class CombinedApp(QMainWindow):
         main_layout.addLayout(self.tracker_mode_switcher)
         self.tracker_stacked_widget = QStackedWidget()
         self.app_entry_panel = ApplicationEntryPanel()
+        self.app_entry_panel.is_gmail_connected = self.gmail_connected
         self.app_dashboard_panel = ApplicationDashboardPanel()
         self.tracker_stacked_widget.addWidget(self.app_entry_panel)
         self.tracker_stacked_widget.addWidget(self.app_dashboard_panel)
@@ -1451,12 +3906,7 @@ class CombinedApp(QMainWindow):
             app_id_to_delete = data.get("id")
             if not app_id_to_delete:
                 return
-            initial_count = len(self.applications)
-                #Create a new list excluding the application to be deleted
-            self.applications = [app for app in self.applications if app.get("id") != app_id_to_delete]
-
-                #If the list is now shorter, successful
-            if len(self.applications) < initial_count:
+            if self.applications.remove(app_id_to_delete):
                 print(f"Application deleted for ID {app_id_to_delete}. Saving and refreshing.")
                 self.save_applications()
                 self.update_app_dashboard.emit(self.applications)  # refresh
@@ -1464,26 +3914,20 @@ class CombinedApp(QMainWindow):
                 print(f"Warning: Could not find app with ID {app_id_to_delete} to delete.")
         else:
             app_id_to_update = action  
-            app_found = False
-            for app in self.applications:
-                if app.get("id") == app_id_to_update:
-                    app.update(data)  
-                    app_found = True
-                    if 'result' in data:
-                        app.setdefault("timeline", []).append({
-                            "event": f"Result Entered: {data['result']}",
-                            "date": QDate.currentDate().toString(Qt.DateFormat.ISODate)
-                        })
-                    break
+            app_found = self.applications.update(app_id_to_update, data) is not None
+            if app_found and 'result' in data:
+                self.applications.append_event(app_id_to_update, f"Result Entered: {data['result']}",
+                                               QDate.currentDate().toString(Qt.DateFormat.ISODate))
             if app_found:
                 print(f"Application updated for ID {app_id_to_update}. Saving and refreshing.")
                 self.save_applications()
                 self.update_app_dashboard.emit(self.applications)  #refresh fr fr
             else:
                 print(f"Warning: Could not find app with ID {app_id_to_update} to update.")
-        if self.app_entry_panel.is_gmail_connected:
+        if self.gmail_connected:
             self._start_gmail_monitor()
     def set_gmail_connected_status(self, status: bool):
+        self.gmail_connected = status
         self.app_entry_panel.is_gmail_connected = status
         print(f"Global Gmail connected status updated to: {status}")
         if status:
@@ -1502,19 +3946,11 @@ class CombinedApp(QMainWindow):
             self.gmail_monitor.stop()
 
     def add_application_to_db(self, app_data: dict):
-        app_id_candidate = f"{app_data['school_name'].replace(' ', '_').lower()}_{app_data['submission_date']}"
-        existing_ids = {app.get('id') for app in self.applications}
-        if app_id_candidate in existing_ids:
-            counter = 1
-            while f"{app_id_candidate}_{counter}" in existing_ids:
-                counter += 1
-            app_data["id"] = f"{app_id_candidate}_{counter}"
-        else:
-            app_data["id"] = app_id_candidate
-        self.applications.append(app_data)
+        app_data["id"] = self.applications.next_id(app_data['school_name'], app_data['submission_date'])
+        self.applications.add(app_data)
         self.save_applications()
         self.update_app_dashboard.emit(self.applications)
-        if self.app_entry_panel.is_gmail_connected:
+        if self.gmail_connected:
             self._start_gmail_monitor()
 
     def _send_app_to_n8n(self, app_data):
@@ -1568,12 +4004,7 @@ class CombinedApp(QMainWindow):
         return domain_map.get(school_name, [f"{school_name.lower().replace(' ', '')}.edu"])
     @pyqtSlot(str, bool)
     def update_application_monitor_status(self, app_id: str, enabled: bool):
-        found = False
-        for app in self.applications:
-            if app.get("id") == app_id:
-                app["auto_monitor"] = enabled
-                found = True
-                break
+        found = self.applications.update(app_id, {"auto_monitor": enabled}) is not None
         if found:
             self.save_applications()
             self.update_app_dashboard.emit(self.applications)
@@ -1582,17 +4013,11 @@ class CombinedApp(QMainWindow):
             print(f"Application with ID {app_id} not found for monitor status update.")
     @pyqtSlot(str, str)
     def update_application_result(self, app_id: str, result: str):
-        found = False
-        for app in self.applications:
-            if app.get("id") == app_id:
-                app["result"] = result
-                app["status"] = "Decision Processed" if result not in ["Pending", "Deferred",
-                                                                       "Waitlisted"] else "Decision Released"
-                app["timeline"].append(
-                    {"event": f"Result Entered: {result}", "date": QDate.currentDate().toString(Qt.DateFormat.ISODate)})
-                found = True
-                break
+        status = "Decision Processed" if result not in ["Pending", "Deferred", "Waitlisted"] else "Decision Released"
+        found = self.applications.update(app_id, {"result": result, "status": status}) is not None
         if found:
+            self.applications.append_event(app_id, f"Result Entered: {result}",
+                                           QDate.currentDate().toString(Qt.DateFormat.ISODate))
             self.save_applications()
             self.update_app_dashboard.emit(self.applications)
             print(f"Updated result for app ID {app_id} to {result}.")
@@ -1603,20 +4028,19 @@ class CombinedApp(QMainWindow):
         if os.path.exists(self.applications_db_file):
             try:
                 with open(self.applications_db_file, "r") as f:
-                    return json.load(f)
+                    return ApplicationRegistry(json.load(f))
             except json.JSONDecodeError:
                 print(f"Error reading {self.applications_db_file}, starting fresh.")
-                return []
-        return []
+                return ApplicationRegistry()
+        return ApplicationRegistry()
 
     def save_applications(self):
-        with open(self.applications_db_file, "w") as f:
-            json.dump(self.applications, f, indent=2)
+        self.persistence.write_json(self.applications_db_file, self.applications.to_list())
 
     def switch_to_college_match(self):
         self.current_mode = "college_match"
         self.sectionLabel.setText("College Match Engine")
-        self.stack.setCurrentWidget(self.match_ui)
+        self.stack.setCurrentWidget(self._page("match_ui"))
         self.update_top_bar_buttons()
 
     def build_college_match_ui(self):
@@ -1801,18 +4225,34 @@ class CombinedApp(QMainWindow):
         self.sat_max_input.setText("")
 
     def build_career_result_ui(self):
+        if hasattr(self, 'career_result_ui'):
+            return
         self.career_result_ui = QWidget()
         layout = QVBoxLayout(self.career_result_ui)
         self.back_to_form_btn = QPushButton("← Edit Inputs")
         self.back_to_form_btn.setStyleSheet("padding: 8px; background: #444; color: white; border-radius: 6px;")
-        self.back_to_form_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self.career_ui))
-        layout.addWidget(self.back_to_form_btn)
+        self.back_to_form_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self._page("career_ui")))
+        self.regenerate_career_btn = QPushButton("↻ Regenerate")
+        self.regenerate_career_btn.setStyleSheet(self.back_to_form_btn.styleSheet())
+        self.regenerate_career_btn.setToolTip("Ask the AI again instead of reusing cached guidance")
+        self.regenerate_career_btn.clicked.connect(lambda: self.generate_career(regenerate=True))
+        result_actions = QHBoxLayout()
+        result_actions.addWidget(self.back_to_form_btn)
+        result_actions.addWidget(self.regenerate_career_btn)
+        layout.addLayout(result_actions)
         self.header_row = QHBoxLayout()
         self.header_row.setSpacing(15)
         layout.addLayout(self.header_row)
+        self.career_status = QLabel("")
+        self.career_status.setStyleSheet("color: #aaa;")
+        layout.addWidget(self.career_status)
         self.expanded_area = QHBoxLayout()
         self.expanded_area.setSpacing(15)
         layout.addLayout(self.expanded_area)
+        self.career_sections = {}
+        self.career_cards = {}
+        self.career_stream_event.connect(self.on_career_stream_event)
+        self.career_finished.connect(self.finish_career_stream)
         layout.addStretch(1)
         self.stack.addWidget(self.career_result_ui)
 
@@ -1827,7 +4267,7 @@ class CombinedApp(QMainWindow):
     def switch_to_career(self):
         self.current_mode = "career"
         self.sectionLabel.setText("Career Counselor")
-        self.stack.setCurrentWidget(self.career_ui)
+        self.stack.setCurrentWidget(self._page("career_ui"))
         self.update_top_bar_buttons()
 
     def build_career_ui(self):
@@ -1964,7 +4404,7 @@ class CombinedApp(QMainWindow):
             background: rgba(30, 140, 255, 0.9);
         }
     """)
-        self.career_generate.clicked.connect(self.generate_career)
+        self.career_generate.clicked.connect(lambda: self.generate_career())
         layout.addWidget(self.career_generate)
         self.loading_gif = QLabel()
         if os.path.exists("loading.gif"):
@@ -1979,27 +4419,8 @@ class CombinedApp(QMainWindow):
         layout.addStretch()
         self.stack.addWidget(self.career_ui)
 
-    def generate_career(self):
+    def generate_career(self, regenerate=False):
         data = {k: v.text().strip() for k, v in self.career_inputs.items()}
-        prompt = f"""
-You are an elite AI career counselor helping a high school student explore future opportunities. Be realistic. No bold words.
-Label each section with a number and a period, using these exact section titles:
-1. Ideal Career Paths
-2. Recommended College Majors
-3. Best Universities for Recommended Majors
-4. Preparation Roadmap
-Do not use any other section headers or formatting.
-Be thorough and detailed in your explanations.
-
-Profile:
-Skills: {data['skills']}
-Interests: {data['interests']}
-Classes Taken: {data['classes taken']}
-GPA: {data['gpa']}
-Extracurriculars: {data['extracurriculars']}
-Résumé Info: {data['résumé (optional)'] or 'N/A'}
-No bold words or letters, have at least 5 career paths, 5 recommended college majors, 10 universities.
-"""
         self.last_profile = data
         self.college_profile = {
             "major": data.get("interests", ""),
@@ -2012,62 +4433,132 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
             self.loading_gif.setVisible(True)
             self.loading_movie.start()
 
+        request_id, token = self.requests.start("career")
+        self._page("career_result_ui")
+
         def worker():
             try:
-                #Ensure model is accessible
-                if model is None:
+                #Ensure a backend is available
+                if LLM_BACKEND is None:
                     # Handle case where model wasn't initialized due to missing API key
                     QMetaObject.invokeMethod(self, "show_results", Qt.ConnectionType.QueuedConnection,
                                              Q_ARG(str, "ERROR: Gemini model not initialized. API key missing."))
                     return
 
-                response = model.generate_content(prompt)
-                result = response.text
+                sections = generate_career_sections(
+                    data, on_event=lambda event: self.career_stream_event.emit(request_id, event),
+                    bypass_cache=regenerate, cancel_token=token)
+                result = join_career_sections(sections)
+            except RequestCancelled:
+                print(f"Career request {request_id} was superseded.")
+                return
             except Exception as e:
                 result = f"ERROR: {e}"
-            self.history.append({"profile": data, "result": result})
-            self.save_history()
-            QMetaObject.invokeMethod(self, "show_results", Qt.ConnectionType.QueuedConnection, Q_ARG(str, result))
-        threading.Thread(target=worker).start()
+            record = {"id": uuid.uuid4().hex, "profile": data, "result": result,
+                      "ts": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+            self.persistence.submit(lambda: self.history.append(record))
+            if not result.startswith("ERROR:"):
+                self.persistence.submit(lambda: self.search_index.upsert(*self._career_search_doc(record)))
+            self.career_finished.emit(request_id, result)
+        self._clear_career_results()
+        self.career_status.setText("Generating...")
+        LLM_SERVICE.submit(worker, feature="career", cancel_token=token)
 
     @pyqtSlot(str)
     def show_results(self, text):
-        if self.loading_movie:
-            self.loading_movie.stop()
-            self.loading_gif.setVisible(False)
+        self._page("career_result_ui")
+        self._stop_career_loading()
         if text.startswith("ERROR:"):
             QMessageBox.critical(self, "Gemini API Error", text)
             return
+        sections = extract_career_sections(text)
+        if not sections:
+            QMessageBox.information(self, "Gemini Output",
+                                    "The AI did not return content in the expected format. Please try again.")
+            return
+        self._clear_career_results()
+        for title, content in sections.items():
+            self.career_sections[title] = content
+            self._add_career_card(title)
+        self.stack.setCurrentWidget(self.career_result_ui)
+
+    def _stop_career_loading(self):
+        if self.loading_movie:
+            self.loading_movie.stop()
+            self.loading_gif.setVisible(False)
+        self.career_status.setText("")
+
+    def _clear_career_results(self):
         for layout in [self.header_row, self.expanded_area]:
             for i in reversed(range(layout.count())):
                 widget = layout.itemAt(i).widget()
                 if widget:
                     widget.setParent(None)
-        def extract_sections(text):
-            pattern = r"^(\d\.\s+[^.]+?\s*\.)"
-            matches = list(re.finditer(pattern, text, re.MULTILINE))
-            sections = {}
-            for i, match in enumerate(matches):
-                start = match.end()
-                end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
-                header = match.group(1).strip()
-                title = re.sub(r"^\d\.\s+", "", header).rstrip(" .")
-                content = text[start:end].strip()
-                sections[title] = content
-            return sections
-        sections = extract_sections(text)
-        if not sections:
+        self.career_sections = {}
+        self.career_cards = {}
+
+    @staticmethod
+    def _format_career_content(content):
+        #Older free-text results use "-" or "* **" list markers; only a marker at a line start becomes a bullet
+        return re.sub(r"^[ \t]*(?:\* \*\*|[-*•])[ \t]*", CAREER_BULLET, content.strip(), flags=re.MULTILINE)
+
+    @classmethod
+    def _career_summary(cls, content):
+        content = cls._format_career_content(content)
+        return content.split(".")[0] + "." if "." in content else content.split("\n")[0]
+
+    def _add_career_card(self, title):
+        header = CardHeader(title, self._career_summary(self.career_sections.get(title, "")))
+        #Look the content up on click so a card opened mid-stream shows the latest text
+        header.clicked.connect(
+            lambda t=title: self.toggle_expanded_card(t, self._format_career_content(self.career_sections[t])))
+        self.header_row.addWidget(header)
+        self.career_cards[title] = header
+
+    @pyqtSlot(int, object)
+    def on_career_stream_event(self, request_id, event):
+        """Builds a card as soon as its header streams in and keeps its content current."""
+        if not self.requests.is_current("career", request_id):
+            return
+        if event[0] == "section":
+            title = event[1]
+            if title in self.career_cards:
+                return
+            self.career_sections[title] = ""
+            self._add_career_card(title)
+            if self.stack.currentWidget() is not self.career_result_ui:
+                self._stop_career_loading()
+                self.career_status.setText("Generating...")
+                self.stack.setCurrentWidget(self.career_result_ui)
+        elif event[0] == "content":
+            title, text = event[1], event[2]
+            self.career_sections[title] = self.career_sections.get(title, "") + text
+            #Headers are created before any content arrives, so their summary is filled in here
+            if title in self.career_cards:
+                self.career_cards[title].set_summary(self._career_summary(self.career_sections[title]))
+            for i in range(self.expanded_area.count()):
+                widget = self.expanded_area.itemAt(i).widget()
+                if isinstance(widget, ExpandedCard) and widget.title == title:
+                    widget.content_label.setText(self._format_career_content(self.career_sections[title]))
+
+    @pyqtSlot(int, str)
+    def finish_career_stream(self, request_id, text):
+        if not self.requests.is_current("career", request_id):
+            return
+        self.requests.finish("career", request_id)
+        self._stop_career_loading()
+        if text.startswith("ERROR:"):
+            QMessageBox.critical(self, "Gemini API Error", text)
+            return
+        if not self.career_cards:
             QMessageBox.information(self, "Gemini Output",
                                     "The AI did not return content in the expected format. Please try again.")
             return
-        self.expanded_cards = {}
-        for title, content in sections.items():
-            content = content.replace("* **", "     • ").replace("-", "       • ")
-            summary = content.split(".")[0] + "." if "." in content else content.split("\n")[0]
-            header = CardHeader(title, summary)
-            header.clicked.connect(lambda t=title, c=content: self.toggle_expanded_card(t, c))
-            self.header_row.addWidget(header)
-        self.stack.setCurrentWidget(self.career_result_ui)
+        for i in range(self.expanded_area.count()):
+            widget = self.expanded_area.itemAt(i).widget()
+            if isinstance(widget, ExpandedCard) and widget.title in self.career_sections:
+                widget.content_label.setText(self._format_career_content(self.career_sections[widget.title]))
+
     def toggle_expanded_card(self, title, content):
         for i in range(self.expanded_area.count()):
             widget = self.expanded_area.itemAt(i).widget()
@@ -2081,24 +4572,14 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
         card = ExpandedCard(title, content, font=QFont("Typo Round Regular Demo"))
         self.expanded_area.addWidget(card)
 
-    def save_history(self):
-        with open("career_history.json", "w") as f:
-            json.dump(self.history, f, indent=2)
-
     def load_history(self):
-        if os.path.exists("career_history.json"):
-            try:
-                with open("career_history.json", "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print("Error loading career_history.json, starting fresh.")
-                return []
-        return []
+        return CareerHistoryLog(CAREER_HISTORY_FILE, background=self.persistence.submit,
+                                on_dropped=self._drop_career_docs)
 
     def switch_to_explainer(self):
         self.current_mode = "explainer"
         self.sectionLabel.setText("Academic Explainer")
-        self.stack.setCurrentWidget(self.explainer_ui)
+        self.stack.setCurrentWidget(self._page("explainer_ui"))
         self.update_top_bar_buttons()
 
     def build_explainer_ui(self):
@@ -2107,23 +4588,47 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
         self.explainer_ui = QWidget()
         layout = QVBoxLayout(self.explainer_ui)
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
+        left = QWidget()
+        left.setMaximumWidth(250)
+        llayout = QVBoxLayout(left)
+        llayout.setContentsMargins(0, 0, 0, 0)
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText("🔍 Search explanations, notes, careers...")
+        self.searchInput.setClearButtonEnabled(True)
+        llayout.addWidget(self.searchInput)
         self.historyList = QListWidget()
-        self.historyList.setMaximumWidth(250)
-        self.splitter.addWidget(self.historyList)
+        llayout.addWidget(self.historyList)
+        self.searchResults = QListWidget()
+        self.searchResults.setWordWrap(True)
+        self.searchResults.setVisible(False)
+        llayout.addWidget(self.searchResults)
+        self.splitter.addWidget(left)
         self.historyList.itemClicked.connect(self.on_select_history)
         for topic in self.explainer_data.get("history", []):
             self.historyList.addItem(QListWidgetItem(topic))
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.searchInput.textChanged.connect(lambda _: self.search_timer.start())
+        self.searchResults.itemClicked.connect(self.on_select_search_result)
         right = QWidget()
         rlayout = QVBoxLayout(right)
         top = QHBoxLayout()
         self.topicInput = QLineEdit()
         self.generateBtn = QPushButton("Generate")
+        self.regenerateBtn = QPushButton("Regenerate")
+        self.regenerateBtn.setToolTip("Ask the AI again instead of reusing a cached explanation")
         self.testModeBtn = QPushButton("Test Mode")
+        self.parallelCheck = QCheckBox("Parallel long-form")
+        self.parallelCheck.setToolTip("Outline first, then write the sections at the same time")
         self.newChatBtn = QPushButton("New Chat")
         self.themeSwitchBtn = QPushButton("🌓")
         top.addWidget(self.topicInput)
         top.addWidget(self.generateBtn)
+        top.addWidget(self.regenerateBtn)
         top.addWidget(self.testModeBtn)
+        top.addWidget(self.parallelCheck)
         top.addWidget(self.newChatBtn)
         top.addWidget(self.themeSwitchBtn)
         rlayout.addLayout(top)
@@ -2140,21 +4645,29 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
         self.splitter.addWidget(right)
         layout.addWidget(self.splitter)
         self.explainer_response_ready.connect(self.handle_explainer_response)
-        self.generateBtn.clicked.connect(self.on_generate)
+        self.explainer_chunk_ready.connect(self.append_explainer_chunk)
+        self.generateBtn.clicked.connect(lambda: self.on_generate())
+        self.regenerateBtn.clicked.connect(lambda: self.on_generate(regenerate=True))
         self.testModeBtn.clicked.connect(lambda: self.on_generate(test_mode=True))
         self.newChatBtn.clicked.connect(self.on_new_chat)
-        self.topicInput.returnPressed.connect(self.on_generate)
+        self.topicInput.returnPressed.connect(lambda: self.on_generate())
         self.themeSwitchBtn.clicked.connect(self.toggle_theme)
         self.stack.addWidget(self.explainer_ui)
-        self.apply_theme(self.current_theme)
 
-    def on_generate(self, test_mode=False):
+    def on_generate(self, test_mode=False, regenerate=False):
         topic = self.topicInput.text().strip()
         if not topic:
             QMessageBox.warning(self, "Input Required", "Please enter a topic to explain.")
             return
         self.status.setText("Generating...")
-        self.explanationDisplay.clear()
+        #Test Mode only adds exam prep below an explanation the topic already has
+        stored = self._stored_explanation(topic) if test_mode else ""
+        if stored:
+            self.explanationDisplay.setPlainText(stored + "\n\n")
+        else:
+            self.explanationDisplay.clear()
+        request_id, token = self.requests.start("explainer")
+        parallel = self.parallelCheck.isChecked()
     
         def worker():
             try:
@@ -2162,33 +4675,73 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
                     f"Imagine you're Richard Feynman explaining '{topic}' to curious high schoolers. "
                     "Go deep with examples and metaphors. No bold text or lists — just smooth, connected teaching. Be thorough and don't write it like a script, write it like an explanation by richard feynman. Don't address the reader as class. Also, be thorough, extremely thorough. Long. Don't gloss over things, go deep. Ten pages at least."
                 )
+                on_chunk = lambda text: self.explainer_chunk_ready.emit(request_id, text)
+                result = stored
+                if not result:
+                    if parallel:
+                        #Length is set per section instead of for the whole piece
+                        result = generate_long_form(topic, prompt.replace(" Ten pages at least.", ""),
+                                                    on_chunk=on_chunk, bypass_cache=regenerate,
+                                                    cancel_token=token).strip()
+                    else:
+                        result = generate_text(prompt, feature="explainer", stream=True, on_chunk=on_chunk,
+                                               bypass_cache=regenerate, cancel_token=token).strip()
+                    if test_mode:
+                        on_chunk("\n\n")
+                test_prep = None
                 if test_mode:
-                    prompt += "\nAlso prepare the student for a test with formulas, edge cases, and pitfalls. Don't label the sections be natural. Should include them still though. Still thorough through everything"
-
-                if model is None:
-                    raise ValueError("Gemini model not initialized. API key missing.")
-                response = model.generate_content(prompt)
-                if not response.parts:
-                    feedback = response.prompt_feedback
-                    block_reason = "Unknown"
-                    if feedback and hasattr(feedback, 'block_reason') and feedback.block_reason:
-                        block_reason = feedback.block_reason.name
-                    raise ValueError(f"The AI response was empty. Reason: {block_reason}")
-                result = response.text.strip()
+                    test_prep = generate_text(self._test_prep_prompt(topic, result), feature="explainer_test_prep",
+                                              stream=True, on_chunk=on_chunk, bypass_cache=regenerate,
+                                              cancel_token=token).strip()
                 #Emit a success signal
                 self.explainer_response_ready.emit({
                     "status": "success",
+                        "request_id": request_id,
                         "topic": topic,
-                        "result": result
+                        "result": result,
+                        "test_prep": test_prep,
+                        "streamed": True
                 })
+            except RequestCancelled:
+                print(f"Explainer request {request_id} for '{topic}' was superseded.")
             except Exception as e:
                 # Emit an error signal 
                 self.explainer_response_ready.emit({
                         "status": "error",
+                        "request_id": request_id,
                         "topic": topic,
                         "error": str(e)
                  })
-        threading.Thread(target=worker, daemon=True).start()
+        LLM_SERVICE.submit(worker, feature="explainer", cancel_token=token)
+
+    def _stored_explanation(self, topic):
+        return self.explainer_data.get("topics", {}).get(topic, {}).get("explanation", "").strip()
+
+    def _test_prep_prompt(self, topic, explanation):
+        #The addendum only needs to know what was covered, not every word of it
+        context = explanation[:self.TEST_PREP_CONTEXT_CHARS]
+        return (
+            f"A student has just read this explanation of '{topic}':\n\n{context}\n\n"
+            "Without repeating it, continue in the same Richard Feynman voice and prepare them for a test: the "
+            "formulas, edge cases, and pitfalls. Don't label the sections be natural. Should include them still "
+            "though. Still thorough through everything. No bold text or lists."
+        )
+
+    def _explainer_text(self, topic):
+        entry = self.explainer_data.get("topics", {}).get(topic, {})
+        parts = [entry.get("explanation", ""), entry.get("test_prep", "")]
+        return "\n\n".join(p for p in parts if p)
+
+    @pyqtSlot(int, str)
+    def append_explainer_chunk(self, request_id, text):
+        """Appends one streamed chunk at the end of the document without re-laying out the rest."""
+        if not self.requests.is_current("explainer", request_id):
+            return
+        if self.explanationDisplay.document().isEmpty():
+            self.status.setText("Streaming...")
+        cursor = QTextCursor(self.explanationDisplay.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
 
     @pyqtSlot(dict)
     def handle_explainer_response(self, response_data):
@@ -2197,32 +4750,48 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
         """
         status = response_data.get("status")
         topic = response_data.get("topic")
+        request_id = response_data.get("request_id")
+        if request_id is not None:
+            if not self.requests.is_current("explainer", request_id):
+                return
+            self.requests.finish("explainer", request_id)
         if status == "success":
             result = response_data.get("result", "")
-            self.explanationDisplay.setText(result)
+            if not response_data.get("streamed"):
+                self.explanationDisplay.setText(result)
             self.status.setText("Done.")
                 #Update history 
             if topic not in self.explainer_data.get("history", []):
                 self.explainer_data.setdefault("history", []).append(topic)
                 self.historyList.addItem(topic)
-            self.explainer_data.setdefault("topics", {}).setdefault(topic, {})["explanation"] = result
+            entry = self.explainer_data.setdefault("topics", {}).setdefault(topic, {})
+            entry["explanation"] = result
+            if response_data.get("test_prep"):
+                entry["test_prep"] = response_data["test_prep"]
+            else:
+                #A fresh explanation makes any earlier test prep stale
+                entry.pop("test_prep", None)
             notes = self.explainer_data.get("topics", {}).get(topic, {}).get("notes", "")
             self.notesArea.setText(notes)
-            self.save_explainer_data()
+            self.save_explainer_data(topic)
+            self._index_topic(topic)
         elif status == "error":
             error_message = response_data.get("error", "An unknown error occurred.")
             self.status.setText(f"Error.")
             QMessageBox.critical(self, "Gemini API Error", f"Failed to generate explanation:\n{error_message}")
     def on_new_chat(self):
+        self.requests.cancel("explainer")
         topic = self.topicInput.text().strip()
         if topic:
             if topic not in self.explainer_data.get("history", []):
                 self.explainer_data.setdefault("history", []).append(topic)
                 self.historyList.addItem(topic)
-            self.explainer_data.setdefault("topics", {}).setdefault(topic, {})[
-                "explanation"] = self.explanationDisplay.toPlainText()
+            entry = self.explainer_data.setdefault("topics", {}).setdefault(topic, {})
+            if not entry.get("explanation"):
+                entry["explanation"] = self.explanationDisplay.toPlainText()
             self.explainer_data.get("topics", {}).get(topic, {})["notes"] = self.notesArea.toPlainText()
-            self.save_explainer_data()
+            self.save_explainer_data(topic)
+            self._index_topic(topic)
             self.topicInput.clear()
             self.explanationDisplay.clear()
             self.notesArea.clear()
@@ -2237,7 +4806,7 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
     def on_select_history(self, item):
         topic = item.text()
         self.topicInput.setText(topic)
-        self.explanationDisplay.setText(self.explainer_data.get("topics", {}).get(topic, {}).get("explanation", ""))
+        self.explanationDisplay.setText(self._explainer_text(topic))
         self.notesArea.blockSignals(True)
         self.notesArea.setText(self.explainer_data.get("topics", {}).get(topic, {}).get("notes", ""))
         self.notesArea.blockSignals(False)
@@ -2246,12 +4815,84 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
         topic = self.topicInput.text().strip()
         if topic:
             self.explainer_data.setdefault("topics", {}).setdefault(topic, {})["notes"] = self.notesArea.toPlainText()
-            self.save_explainer_data()
+            self.save_explainer_data(topic)
+            self._index_topic(topic, explanation=False)
+
+    #Search
+    def _index_topic(self, topic, explanation=True, notes=True):
+        entry = self.explainer_data.get("topics", {}).get(topic, {})
+        rows = []
+        if explanation:
+            rows.append((f"topic:{topic}", "explanation", topic, self._explainer_text(topic)))
+        if notes:
+            rows.append((f"notes:{topic}", "notes", topic, entry.get("notes", "")))
+        self.persistence.submit(lambda: self.search_index.upsert_many(rows),
+                                key=("search", topic, explanation, notes))
+
+    def _career_search_doc(self, record):
+        profile = record.get("profile", {})
+        label = profile.get("interests") or profile.get("skills") or "profile"
+        #Records logged before ids existed fall back to their timestamp
+        doc_id = f"career:{record.get('id') or record.get('ts', '')}"
+        return (doc_id, "career", f"Career guidance – {label}", record.get("result", ""))
+
+    def _drop_career_docs(self, records):
+        #Runs on the persistence thread right after compaction
+        self.search_index.delete_many([self._career_search_doc(r)[0] for r in records])
+
+    def _rebuild_search_index(self):
+        rows = []
+        for topic, entry in self.explainer_data.get("topics", {}).items():
+            rows.append((f"topic:{topic}", "explanation", topic, self._explainer_text(topic)))
+            rows.append((f"notes:{topic}", "notes", topic, entry.get("notes", "")))
+        for record in self.history.entries():
+            if not str(record.get("result", "")).startswith("ERROR:"):
+                rows.append(self._career_search_doc(record))
+        if rows:
+            self.search_index.upsert_many(rows)
+            print(f"Built search index with {len(rows)} documents.")
+
+    def run_search(self):
+        query = self.searchInput.text().strip()
+        self.searchResults.clear()
+        self.historyList.setVisible(not query)
+        self.searchResults.setVisible(bool(query))
+        if not query:
+            return
+        kind_labels = {"explanation": "📘", "notes": "📝", "career": "🧭"}
+        hits = self.search_index.search(query)
+        if not hits:
+            self.searchResults.addItem(QListWidgetItem("No matches."))
+            return
+        for hit in hits:
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, hit["doc_id"])
+            label = QLabel(f"{kind_labels.get(hit['kind'], '')} <b>{html.escape(hit['title'])}</b>"
+                           f"<br><span style='color: #aaa;'>{hit['snippet']}</span>")
+            label.setWordWrap(True)
+            label.setTextFormat(Qt.TextFormat.RichText)
+            label.setContentsMargins(4, 4, 4, 4)
+            label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+            self.searchResults.addItem(item)
+            self.searchResults.setItemWidget(item, label)
+            item.setSizeHint(QSize(0, label.heightForWidth(max(200, self.searchResults.viewport().width())) + 8))
+
+    def on_select_search_result(self, item):
+        doc_id = item.data(Qt.ItemDataRole.UserRole)
+        if not doc_id:
+            return
+        kind, _, key = doc_id.partition(":")
+        if kind in ("topic", "notes"):
+            self.on_select_history(QListWidgetItem(key))
+        elif kind == "career":
+            doc = self.search_index.get(doc_id)
+            if doc:
+                self.switch_to_career()
+                self.show_results(doc["body"])
 
     def toggle_theme(self):
         self.current_theme = "hand" if self.current_theme == "dark" else "dark"
-        with open("settings.json", "w") as f:
-            json.dump({"theme": self.current_theme}, f)
+        self.persistence.write_json("settings.json", {"theme": self.current_theme}, indent=None)
         self.apply_theme(self.current_theme)
 
     def apply_theme(self, theme):
@@ -2291,33 +4932,93 @@ No bold words or letters, have at least 5 career paths, 5 recommended college ma
             font = QFont("Black-Brownies", 16)
             QApplication.setFont(font)
             self.setStyleSheet(base_hand_style)
-        self.update_top_bar_buttons()
         if hasattr(self, 'app_entry_panel'):
             self.app_entry_panel.apply_styles()
             self.app_dashboard_panel.apply_styles()
 
+    EXPLAINER_COMPRESSED_FIELDS = ("explanation", "test_prep", "notes")
+    TEST_PREP_CONTEXT_CHARS = 12000
+
     def load_explainer_data(self):
+        #Encoded topic entries as they are on disk; only the writer thread touches it after load
+        self._stored_topics = {}
+        self._unsaved_topics = {}
+        self._unsaved_lock = threading.Lock()
         if os.path.exists("history.json"):
             try:
                 with open("history.json", "r") as f:
                     all_data = json.load(f)
-                    return all_data
-            except json.JSONDecodeError:
-                print("Error reading history.json, starting fresh for explainer.")
+                topics = all_data.get("topics", {})
+                self._stored_topics = dict(topics)
+                for topic, entry in topics.items():
+                    topics[topic] = TEXT_CODEC.decode_fields(entry, self.EXPLAINER_COMPRESSED_FIELDS)
+                return all_data
+            except Exception as e:
+                #Starting fresh would let the next save overwrite everything, so keep the unreadable file
+                backup = move_aside("history.json")
+                print(f"Error reading history.json ({e}); moved it to {backup}, starting fresh for explainer.")
+                self._stored_topics = {}
                 return {"topics": {}, "history": []}
         return {"topics": {}, "history": []}
 
-    def save_explainer_data(self):
-        with open("history.json", "w") as f:
-            json.dump(self.explainer_data, f, indent=2)
+    def save_explainer_data(self, *topics):
+        """Saves history.json, re-encoding only the given topics, on the writer thread."""
+        with self._unsaved_lock:
+            for topic in topics:
+                self._unsaved_topics[topic] = dict(self.explainer_data.get("topics", {}).get(topic, {}))
+        rest = {k: list(v) if isinstance(v, list) else v for k, v in self.explainer_data.items() if k != "topics"}
+
+        def build():
+            with self._unsaved_lock:
+                changed, self._unsaved_topics = self._unsaved_topics, {}
+            for topic, entry in changed.items():
+                self._stored_topics[topic] = TEXT_CODEC.encode_fields(entry, self.EXPLAINER_COMPRESSED_FIELDS)
+            return {**rest, "topics": self._stored_topics}
+
+        self.persistence.write_json_later("history.json", build)
+
+    def closeEvent(self, event):
+        self._stop_gmail_monitor()
+        self.persistence.submit(self.history.sync)
+        self.persistence.close()
+        self.history.close()
+        self.search_index.close()
+        super().closeEvent(event)
+
+
+class FirstPaintProbe(QObject):
+    """Records the time from show() to the window's first paint, prints the profile and quits."""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.shown_at = time.perf_counter()
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            STARTUP_PROFILE.record("first paint", time.perf_counter() - self.shown_at)
+            QTimer.singleShot(0, self._finish)
+        return False
+
+    def _finish(self):
+        STARTUP_PROFILE.report()
+        QApplication.quit()
+
+
+STARTUP_PROFILE.record("module init", time.perf_counter() - _MODULE_INIT_START)
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    with STARTUP_PROFILE.phase("QApplication"):
+        app = QApplication(sys.argv)
     palette = QPalette()
     palette.setColor(QPalette.ColorRole.Window, QColor(18, 18, 18))
     palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
     app.setPalette(palette)
-    win = CombinedApp()
+    with STARTUP_PROFILE.phase("CombinedApp"):
+        win = CombinedApp()
+    if STARTUP_PROFILE.enabled:
+        FirstPaintProbe(win)
     win.show()
     sys.exit(app.exec())
\ No newline at end of file
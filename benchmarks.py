@@ -0,0 +1,531 @@
+"""
+Pathwise benchmarks.
+
+Usage:
+    python benchmarks.py compression [--corpus history.json]
+    python benchmarks.py dashboard_qa [--apps 500] [--llm-latency 0.6]
+    python benchmarks.py backend [--requests 40] [--llm-latency 0.05] [--http]
+    python benchmarks.py dashboard [--sizes 100,1000,10000] [--legacy-max 1000]
+    python benchmarks.py insights [--apps 500] [--requests 40]
+    python benchmarks.py shadows [--cards 60]
+    python benchmarks.py startup
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import subprocess
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import Pathwise
+
+
+#Helpers
+
+def _timeit(fn, repeat=5):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def _fmt_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+_SENTENCES = [
+    "Imagine you are holding a ball and you let it go, and it falls to the ground.",
+    "Now the interesting thing is not that it falls, but how it falls, faster and faster each second.",
+    "Nature does not care what we call things; the names are just labels we stick on to keep track.",
+    "If you push on something, it pushes back on you just as hard, and that is the whole trick of a rocket.",
+    "The energy does not disappear, it just moves around, hiding in the motion of the little atoms.",
+    "You might think this is obvious, but people argued about it for two thousand years.",
+    "Let us try a small experiment in our heads, the kind you can do lying in bed.",
+    "The equation is only a shorthand for a story about what happens, step by step.",
+    "When a student asks why, the honest answer is often that we measured it and that is what we found.",
+    "Ideal Career Paths include software engineering, data science, and research positions in industry.",
+    "Recommended College Majors are computer science, applied mathematics, and electrical engineering.",
+    "A strong preparation roadmap starts with summer research, competitions, and a portfolio of projects.",
+]
+
+
+def synthetic_corpus(docs=60, paragraphs=25, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        paras = []
+        for _ in range(paragraphs):
+            paras.append(" ".join(rng.choice(_SENTENCES) for _ in range(rng.randint(4, 9))))
+        corpus.append("\n\n".join(paras))
+    return corpus
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {"p50": pick(50), "p90": pick(90), "p99": pick(99), "max": ordered[-1]}
+
+
+_SCHOOLS = ["Stanford University", "Harvard University", "Yale University", "Duke University", "Rice University",
+            "Emory University", "Brown University", "Tufts University", "MIT", "Georgia Institute of Technology"]
+_RESULTS = ["Pending", "Accepted", "Rejected", "Waitlisted", "Deferred"]
+
+
+def synthetic_applications(n, seed=7):
+    rng = random.Random(seed)
+    apps = []
+    for i in range(n):
+        submitted = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        result = rng.choice(_RESULTS)
+        timeline = [{"event": "Submitted", "date": submitted}]
+        if result != "Pending":
+            timeline.append({"event": "Decision Released", "date": f"2026-{rng.randint(1, 4):02d}-{rng.randint(1, 28):02d}"})
+        name = _SCHOOLS[i % len(_SCHOOLS)] + ("" if i < len(_SCHOOLS) else f" Campus {i}")
+        apps.append({
+            "id": f"app_{i}", "school_name": name, "major": rng.choice(["Computer Science", "Biology", "Economics"]),
+            "status": "Submitted", "result": result, "submission_date": submitted,
+            "deadline": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "timeline": timeline,
+            "auto_monitor": False,
+        })
+    return apps
+
+
+def load_corpus(path):
+    if not path or not os.path.exists(path):
+        return synthetic_corpus()
+    texts = []
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    texts.append(Pathwise.TEXT_CODEC.decode(json.loads(line).get("result", "")))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for entry in data.get("topics", {}).values():
+            texts.append(Pathwise.TEXT_CODEC.decode(entry.get("explanation", "")))
+    return [t for t in texts if t] or synthetic_corpus()
+
+
+#Benchmarks
+
+def bench_compression(args):
+    corpus = load_corpus(args.corpus)
+    raw_doc = {"topics": {str(i): {"explanation": t} for i, t in enumerate(corpus)}}
+    raw_json = json.dumps(raw_doc, indent=2)
+    print(f"Corpus: {len(corpus)} documents, {_fmt_bytes(len(raw_json.encode('utf-8')))} as pretty-printed JSON")
+    _, raw_load = _timeit(lambda: json.loads(raw_json))
+    print(f"{'codec':<16}{'on disk':>12}{'ratio':>8}{'encode':>11}{'load+decode':>14}")
+    print(f"{'none':<16}{_fmt_bytes(len(raw_json)):>12}{1.0:>8.2f}{'-':>11}{raw_load * 1000:>12.1f}ms")
+    variants = [("zlib-1", dict(codec="zlib", level=1)),
+                ("zlib-6", dict(codec="zlib", level=6)),
+                ("zlib-9", dict(codec="zlib", level=9))]
+    if Pathwise.zstandard is not None:
+        variants.append(("zstd-3", dict(codec="zstd", level=3)))
+        variants.append(("zstd-3+dict", dict(codec="zstd", level=3, train=True)))
+    for name, opts in variants:
+        train = opts.pop("train", False)
+        #Training also writes one file per dictionary id next to dict_path
+        dict_dir = tempfile.TemporaryDirectory()
+        codec = Pathwise.TextCodec(dict_path=os.path.join(dict_dir.name, "bench_zstd.dict"), **opts)
+        if train:
+            codec.train_dictionary(corpus[: max(1, len(corpus) // 2)])
+
+        def encode():
+            codec._memo.clear()
+            return {"topics": {k: {"explanation": codec.encode(v["explanation"])}
+                               for k, v in raw_doc["topics"].items()}}
+
+        encoded, enc_t = _timeit(encode)
+        stored = json.dumps(encoded, indent=2)
+
+        def decode():
+            return [codec.decode(v["explanation"]) for v in json.loads(stored)["topics"].values()]
+
+        decoded, dec_t = _timeit(decode)
+        assert decoded == corpus
+        size = len(stored.encode("utf-8"))
+        ratio = len(raw_json.encode("utf-8")) / size
+        print(f"{name:<16}{_fmt_bytes(size):>12}{ratio:>8.2f}{enc_t * 1000:>9.1f}ms{dec_t * 1000:>12.1f}ms")
+        dict_dir.cleanup()
+
+
+_QA_QUESTIONS = [
+    "Where did I get accepted?",
+    "How many am I waiting on?",
+    "What's my next deadline?",
+    "How many rejections do I have?",
+    "What happened with MIT?",
+    "Which schools waitlisted me?",
+    "What deadlines are coming up?",
+    "Should I worry about my pending applications?",
+    "What do you think my overall results say about my list?",
+]
+
+
+def _legacy_qa_context(registry):
+    return json.dumps([{
+        "school_name": app.get("school_name", "N/A"), "status": app.get("status", "Unknown"),
+        "result": app.get("result", "Pending"), "major": app.get("major", "N/A"),
+        "deadline": app.get("deadline", "N/A"), "submission_date": app.get("submission_date", "N/A"),
+    } for app in registry], indent=2)
+
+
+def bench_dashboard_qa(args):
+    registry = Pathwise.ApplicationRegistry(synthetic_applications(args.apps))
+    if Pathwise.LLM_BACKEND is None or args.llm_latency is not None:
+        #Latency grows with prompt size like a real round trip
+        Pathwise.LLM_BACKEND = Pathwise.StandInBackend(
+            latency=args.llm_latency if args.llm_latency is not None else 0.6, prompt_latency=0.05)
+    #Measure real round trips: no response cache, no rate limiting
+    cache_dir = tempfile.mkdtemp()
+    Pathwise.LLM_CACHE = Pathwise.LLMResponseCache(path=os.path.join(cache_dir, "bench_cache.db"))
+    Pathwise.LLM_RATE_LIMITER = Pathwise.RateLimiter(per_minute=1e9, burst=1e9)
+
+    def ask(context, question):
+        prompt = f"Here is a summary of my current college applications:\n\n{context}\n\nQuestion: '{question}'"
+        return Pathwise.generate_text(prompt, feature="dashboard_qa", bypass_cache=True)
+
+    def before(question):
+        return ask(_legacy_qa_context(registry), question)
+
+    def after(question):
+        answer = Pathwise.answer_dashboard_question(registry, question)
+        if answer is None:
+            answer = ask(Pathwise.build_dashboard_context(registry, question), question)
+        return answer
+
+    print(f"{len(registry)} applications, {len(_QA_QUESTIONS)} questions x {args.rounds} rounds, "
+          f"model: {Pathwise.LLM_BACKEND.model_name}")
+    local = sum(Pathwise.answer_dashboard_question(registry, q) is not None for q in _QA_QUESTIONS)
+    print(f"Answered locally: {local}/{len(_QA_QUESTIONS)}")
+    print(f"{'path':<10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name, fn in (("before", before), ("after", after)):
+        samples = []
+        for _ in range(args.rounds):
+            for question in _QA_QUESTIONS:
+                start = time.perf_counter()
+                fn(question)
+                samples.append(time.perf_counter() - start)
+        stats = _percentiles(samples)
+        print(f"{name:<10}" + "".join(f"{stats[k] * 1000:>8.1f}ms" for k in ("p50", "p90", "p99", "max")))
+    Pathwise.LLM_CACHE.clear()
+
+
+def bench_backend(args):
+    """Throughput, concurrency and cache behaviour against the stand-in backend, no network needed."""
+    latency = args.llm_latency if args.llm_latency is not None else 0.05
+    standin = Pathwise.StandInBackend(latency=latency)
+    server = None
+    if args.http:
+        server = Pathwise.StandInServer(standin)
+        Pathwise.LLM_BACKEND = Pathwise.HTTPBackend(server.url)
+    else:
+        Pathwise.LLM_BACKEND = standin
+    cache_dir = tempfile.mkdtemp()
+    Pathwise.LLM_CACHE = Pathwise.LLMResponseCache(path=os.path.join(cache_dir, "bench_cache.db"))
+    Pathwise.LLM_RATE_LIMITER = Pathwise.RateLimiter(per_minute=1e9, burst=1e9)
+    prompts = [f"Explain topic number {i} to a curious high schooler." for i in range(args.requests)]
+    print(f"Backend: {Pathwise.LLM_BACKEND.model_name}, {args.requests} streamed requests, "
+          f"{latency * 1000:.0f}ms latency + {standin.chunks - 1} x {standin.chunk_delay * 1000:.0f}ms chunks")
+    print(f"{'workers':<10}{'total':>10}{'req/s':>10}{'p50':>10}{'p90':>10}{'ttft p50':>10}")
+
+    def run(service, bypass_cache):
+        Pathwise.LLM_TELEMETRY.clear()
+        start = time.perf_counter()
+        futures = [service.submit(lambda p=p: Pathwise.generate_text(p, feature="bench", stream=True,
+                                                                      bypass_cache=bypass_cache))
+                   for p in prompts]
+        for f in futures:
+            f.result()
+        return time.perf_counter() - start
+
+    for workers in (2, 4, 8):
+        service = Pathwise.LLMService(workers=workers)
+        total = run(service, bypass_cache=True)
+        stats = Pathwise.LLM_TELEMETRY.summary()["bench"]
+        print(f"{workers:<10}{total:>9.2f}s{len(prompts) / total:>10.1f}"
+              f"{stats['wall'][0.5] * 1000:>8.1f}ms{stats['wall'][0.9] * 1000:>8.1f}ms"
+              f"{stats['ttft'][0.5] * 1000:>8.1f}ms")
+    total = run(service, bypass_cache=False)
+    stats = Pathwise.LLM_TELEMETRY.summary()["bench"]
+    print(f"{'cached':<10}{total:>9.2f}s{len(prompts) / total:>10.1f}   "
+          f"hits {stats['cache_hit']}/{stats['calls']}")
+    if server:
+        server.close()
+    Pathwise.LLM_CACHE.clear()
+
+
+#Dashboard cards: painted model/view vs one widget tree per card
+
+def _rss():
+    """Current resident set size in bytes (Linux), falling back to the peak from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _legacy_card(app):
+    """Approximation of the widget-per-card layout the dashboard used before the model/view rewrite."""
+    from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QPushButton,
+                                 QGraphicsDropShadowEffect)
+    from PyQt6.QtGui import QColor
+    card = QFrame()
+    card.setObjectName("ApplicationCard")
+    shadow = QGraphicsDropShadowEffect(card)
+    shadow.setBlurRadius(1)
+    shadow.setOffset(1, 1)
+    shadow.setColor(QColor(0, 0, 0, 80))
+    card.setGraphicsEffect(shadow)
+    layout = QVBoxLayout(card)
+    layout.setContentsMargins(20, 20, 20, 20)
+    top = QHBoxLayout()
+    school = QLabel(f"🎓 {app.get('school_name', 'N/A')}")
+    school.setWordWrap(True)
+    top.addWidget(school, stretch=1)
+    status = QLabel(app.get("status", "Unknown"))
+    status.setStyleSheet(f"color: {Pathwise.RESULT_COLORS.get(app.get('result'), '#ADD8E6')};")
+    top.addWidget(status)
+    layout.addLayout(top)
+    for key, label in Pathwise.ApplicationCardDelegate.INFO_FIELDS:
+        info = QLabel(f"{label}: {app.get(key, 'N/A')}")
+        info.setStyleSheet("color: #CCC; font-size: 13px;")
+        info.setWordWrap(True)
+        layout.addWidget(info)
+    row = QHBoxLayout()
+    toggle = QCheckBox("Auto Monitor")
+    toggle.setChecked(app.get("auto_monitor", False))
+    row.addWidget(toggle)
+    row.addStretch(1)
+    remove = QPushButton("🗑 Remove")
+    remove.setStyleSheet("QPushButton { background-color: #d9534f; color: white; border-radius: 6px; }")
+    row.addWidget(remove)
+    layout.addLayout(row)
+    return card
+
+
+def _dashboard_child(mode, n):
+    """Builds one dashboard in a fresh process and prints its timings and RSS growth as JSON."""
+    from PyQt6.QtWidgets import QApplication, QScrollArea, QWidget, QGridLayout
+    qt_app = QApplication.instance() or QApplication([])
+    registry = Pathwise.ApplicationRegistry()
+    registry.reset(synthetic_applications(n))
+    rss_before = _rss()
+    start = time.perf_counter()
+    if mode == "view":
+        window = Pathwise.ApplicationDashboardPanel()
+        window.update_dashboard(registry)
+    else:
+        window = QScrollArea()
+        window.setWidgetResizable(True)
+        container = QWidget()
+        grid = QGridLayout(container)
+        for i, app in enumerate(sorted(registry, key=lambda a: a.get("school_name", ""))):
+            grid.addWidget(_legacy_card(app), i // 3, i % 3)
+        window.setWidget(container)
+    build = time.perf_counter() - start
+    window.resize(1200, 900)
+    window.show()
+    qt_app.processEvents()
+    window.grab()
+    first_paint = time.perf_counter() - start
+    print(json.dumps({"build": build, "first_paint": first_paint, "rss": _rss() - rss_before}))
+
+
+def bench_dashboard(args):
+    """Build time and memory of the dashboard at growing application counts, each size in its own process."""
+    if args.child:
+        _dashboard_child(args.child, args.apps)
+        return
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"{'apps':<8}{'mode':<10}{'build':>10}{'first paint':>14}{'RSS':>12}")
+    for n in sizes:
+        for mode in ("view", "widgets"):
+            if mode == "widgets" and n > args.legacy_max:
+                print(f"{n:<8}{mode:<10}{'skipped (--legacy-max)':>36}")
+                continue
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "dashboard", "--child", mode,
+                                  "--apps", str(n)], capture_output=True, text=True, check=True).stdout
+            stats = json.loads(out.strip().splitlines()[-1])
+            print(f"{n:<8}{mode:<10}{stats['build'] * 1000:>8.1f}ms{stats['first_paint'] * 1000:>12.1f}ms"
+                  f"{_fmt_bytes(stats['rss']):>12}")
+
+
+def bench_insights(args):
+    """Running dashboard totals vs a full rescan, checked equal after every add, update and removal."""
+    rng = random.Random(11)
+    apps = synthetic_applications(args.apps)
+    for app in apps[::7]:
+        del app["result"]  #Records saved before results were tracked
+    registry = Pathwise.ApplicationRegistry(apps)
+    insights = registry.insights()
+    results = list(Pathwise.RESULT_KEYWORDS)
+
+    def check(op):
+        expected = Pathwise.InsightsAggregator.recompute(registry)
+        assert insights.summary() == expected, f"after {op}: {insights.summary()} != {expected}"
+
+    check("build")
+    for i in range(args.requests):
+        registry.add({**synthetic_applications(1, seed=i)[0], "id": f"new_{i}"})
+        check("add")
+        registry.update(rng.choice(list(registry))["id"], {"result": rng.choice(results)})
+        check("update")
+        registry.update(rng.choice(list(registry))["id"], {"timeline": []})
+        check("update timeline")
+        registry.remove(rng.choice(list(registry))["id"])
+        check("remove")
+    print(f"{len(registry)} applications, {args.requests * 4} mutations: running totals match a full rescan")
+    _, running = _timeit(insights.summary, repeat=20)
+    _, rescan = _timeit(lambda: Pathwise.InsightsAggregator.recompute(registry))
+    print(f"{'running':<10}{running * 1e6:>10.1f}µs")
+    print(f"{'rescan':<10}{rescan * 1e6:>10.1f}µs")
+
+
+def bench_shadows(args):
+    """Repaint cost of card shadows: a QGraphicsDropShadowEffect per card vs the shared nine-slice pixmap."""
+    from PyQt6.QtWidgets import QApplication, QWidget, QFrame, QGridLayout, QGraphicsDropShadowEffect
+    from PyQt6.QtWidgets import QStyleOptionViewItem
+    from PyQt6.QtGui import QColor, QImage, QPainter
+    from PyQt6.QtCore import QRect
+    qt_app = QApplication.instance() or QApplication([])
+
+    class NineSliceContainer(QWidget):
+        def paintEvent(self, event):
+            painter = QPainter(self)
+            shadow = Pathwise.CardShadow.get(12, 20)
+            for frame in self.findChildren(QFrame):
+                shadow.paint(painter, frame.geometry(), 5, 5)
+            painter.end()
+
+    def container(cls, effect):
+        widget = cls()
+        grid = QGridLayout(widget)
+        grid.setSpacing(20)
+        for i in range(args.cards):
+            frame = QFrame()
+            frame.setFixedSize(360, 280)
+            frame.setStyleSheet("background-color: #1c1c1c; border-radius: 12px;")
+            if effect:
+                shadow = QGraphicsDropShadowEffect(frame)
+                shadow.setBlurRadius(20)
+                shadow.setOffset(5, 5)
+                shadow.setColor(QColor(0, 0, 0, 80))
+                frame.setGraphicsEffect(shadow)
+            grid.addWidget(frame, i // 3, i % 3)
+        widget.show()
+        qt_app.processEvents()
+        return widget
+
+    print(f"Repainting {args.cards} cards (median of 10)")
+    print(f"{'shadow':<22}{'paint':>10}{'per card':>12}")
+    for name, cls, effect in (("none", QWidget, False), ("drop shadow effect", QWidget, True),
+                              ("nine-slice pixmap", NineSliceContainer, False)):
+        widget = container(cls, effect)
+        _, elapsed = _timeit(widget.grab, repeat=10)
+        print(f"{name:<22}{elapsed * 1000:>8.1f}ms{elapsed / args.cards * 1000:>10.2f}ms")
+        widget.close()
+
+    registry = Pathwise.ApplicationRegistry()
+    registry.reset(synthetic_applications(args.cards))
+    model = Pathwise.ApplicationListModel(registry)
+    delegate = Pathwise.ApplicationCardDelegate()
+    image = QImage(1200, 300 * ((args.cards + 2) // 3), QImage.Format.Format_ARGB32_Premultiplied)
+
+    def paint_delegate():
+        painter = QPainter(image)
+        option = QStyleOptionViewItem()
+        for row in range(args.cards):
+            option.rect = QRect(400 * (row % 3), 300 * (row // 3), 380, 300)
+            delegate.paint(painter, option, model.index(row))
+        painter.end()
+
+    _, elapsed = _timeit(paint_delegate, repeat=10)
+    print(f"{'delegate (full cards)':<22}{elapsed * 1000:>8.1f}ms{elapsed / args.cards * 1000:>10.2f}ms")
+
+
+#Main window startup: pages built on first visit vs all pages up front
+
+def _startup_child(mode):
+    """Opens the main window in a fresh process and prints time to first paint and RSS as JSON."""
+    from PyQt6.QtWidgets import QApplication
+    start = time.perf_counter()
+    qt_app = QApplication.instance() or QApplication([])
+    rss_before = _rss()
+    window = Pathwise.CombinedApp()
+    if mode == "eager":
+        for name in window.PAGE_BUILDERS:
+            window._page(name)
+    window.show()
+    qt_app.processEvents()
+    window.grab()
+    first_paint = time.perf_counter() - start
+    print(json.dumps({"first_paint": first_paint, "rss": _rss() - rss_before,
+                      "pages": sum(hasattr(window, name) for name in window.PAGE_BUILDERS)}))
+
+
+def bench_startup(args):
+    """Time to first window and memory with lazily built pages vs building every page at startup."""
+    if args.child:
+        _startup_child(args.child)
+        return
+    workdir = tempfile.mkdtemp()  #so the window's history/settings files don't touch the checkout
+    print(f"{'mode':<10}{'pages':>6}{'first paint':>14}{'RSS':>12}")
+    for mode in ("eager", "lazy"):
+        runs = []
+        for _ in range(args.rounds):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "startup", "--child", mode],
+                                 capture_output=True, text=True, check=True, cwd=workdir).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        first_paint = statistics.median(r["first_paint"] for r in runs)
+        rss = statistics.median(r["rss"] for r in runs)
+        print(f"{mode:<10}{runs[0]['pages']:>6}{first_paint * 1000:>12.1f}ms{_fmt_bytes(rss):>12}")
+
+
+BENCHMARKS = {
+    "compression": bench_compression,
+    "dashboard_qa": bench_dashboard_qa,
+    "backend": bench_backend,
+    "dashboard": bench_dashboard,
+    "insights": bench_insights,
+    "shadows": bench_shadows,
+    "startup": bench_startup,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pathwise benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--corpus", help="history.json or career_history.jsonl to use as the corpus")
+    parser.add_argument("--apps", type=int, default=500, help="number of synthetic applications")
+    parser.add_argument("--rounds", type=int, default=3, help="times each question is asked")
+    parser.add_argument("--llm-latency", type=float, default=None,
+                        help="base latency in seconds of the stand-in model (used when no API key is set)")
+    parser.add_argument("--requests", type=int, default=40, help="requests per concurrency level")
+    parser.add_argument("--http", action="store_true", help="talk to the stand-in through its HTTP server")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated application counts")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="largest count to build with the widget-per-card dashboard (slow)")
+    parser.add_argument("--cards", type=int, default=60, help="cards painted per frame")
+    parser.add_argument("--child", choices=("view", "widgets", "eager", "lazy"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()